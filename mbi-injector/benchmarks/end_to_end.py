@@ -0,0 +1,463 @@
+"""
+End-to-end load benchmark against a throwaway local MariaDB/MySQL server:
+the server is initialized in a temporary directory and only listens on a
+Unix socket, the mod_bi_* / mod_bam_reporting_* schemas are created with
+their daily partitions, dimensions are seeded at the chosen scale, then
+the backfill runs with --fake-data for each writer strategy, pool size,
+batch size and --parallel value. Rows/sec, statements/sec and the CPU time
+of the server are reported for each run.
+
+Needs the server binaries (mariadbd or mysqld) in PATH or --server-bin.
+
+    python3 benchmarks/end_to_end.py --scale 1000 --parallel 1 4
+    python3 benchmarks/end_to_end.py --strategies insert load-data \\
+        --pool-size 8 16 --batch-size 5000 15000 --json results.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from itertools import product
+
+import mysql.connector
+import mysql.connector.pooling
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fill_missing_dates as backfill  # noqa: E402
+from generation import TARGET_DATE  # noqa: E402
+from offline import make_processor  # noqa: E402
+
+DATABASE = "centreon_storage"
+
+# Tables with a fake data generator
+TABLES = [
+    "mod_bam_reporting_ba_availabilities",
+    "mod_bi_hostavailability",
+    "mod_bi_serviceavailability",
+    "mod_bi_hoststateevents",
+    "mod_bi_servicestateevents",
+    "mod_bi_hgmonthavailability",
+    "mod_bi_hgservicemonthavailability",
+    "mod_bi_metricdailyvalue",
+    "mod_bi_metrichourlyvalue",
+    "mod_bi_metricmonthcapacity",
+    "mod_bi_metriccentiledailyvalue",
+    "mod_bi_metriccentileweeklyvalue",
+    "mod_bi_metriccentilemonthlyvalue",
+]
+
+# Writer strategy -> backfill options
+STRATEGIES = {
+    "insert": ["--writer", "insert"],
+    "insert-bulk": ["--writer", "insert", "--bulk-session"],
+    "load-data": ["--writer", "load-data"],
+    "load-data-bulk": ["--writer", "load-data", "--bulk-session"],
+}
+
+DIMENSIONS_DDL = [
+    "CREATE TABLE mod_bi_liveservice (id INT AUTO_INCREMENT PRIMARY KEY, "
+    "name VARCHAR(255), timeperiod_id INT)",
+    "CREATE TABLE mod_bi_servicemetrics (id INT PRIMARY KEY, metric_id INT, "
+    "metric_name VARCHAR(255), service_id INT, host_id INT, KEY (metric_name))",
+    "CREATE TABLE mod_bi_hosts (id INT PRIMARY KEY, host_id INT, "
+    "host_name VARCHAR(255))",
+    "CREATE TABLE mod_bi_services (id INT PRIMARY KEY, service_id INT, "
+    "service_description VARCHAR(255), host_id INT, host_name VARCHAR(255))",
+    "CREATE TABLE mod_bi_hostgroups (id INT PRIMARY KEY, hg_id INT, "
+    "hg_name VARCHAR(255))",
+    "CREATE TABLE mod_bi_hostcategories (id INT PRIMARY KEY, hc_id INT, "
+    "hc_name VARCHAR(255))",
+    "CREATE TABLE mod_bi_servicecategories (id INT PRIMARY KEY, sc_id INT, "
+    "sc_name VARCHAR(255))",
+    "CREATE TABLE mod_bam_reporting_ba (ba_id INT PRIMARY KEY, "
+    "ba_name VARCHAR(255))",
+    "CREATE TABLE mod_bi_time (id INT PRIMARY KEY, hour TINYINT, day TINYINT, "
+    "month_label VARCHAR(20), month TINYINT, year SMALLINT, week TINYINT, "
+    "dayofweek VARCHAR(20), utime INT, dtime DATETIME)",
+    "CREATE TABLE data_bin (id_metric INT, ctime INT, value FLOAT, "
+    "status TINYINT, KEY (id_metric, ctime))",
+]
+REFRESHED_TABLES = ["mod_bi_time", "data_bin"]
+DOUBLE_COLUMNS = {
+    "avg_value",
+    "min_value",
+    "max_value",
+    "first_value",
+    "last_value",
+    "total",
+    "warning_treshold",
+    "critical_treshold",
+    "centile_value",
+    "centile_param",
+}
+
+
+def find_binary(*names: str) -> str:
+    for name in names:
+        path = shutil.which(name) or shutil.which(name, path="/usr/sbin:/usr/libexec")
+        if path:
+            return path
+    return ""
+
+
+def fact_table_ddl(table: str, day_bounds: list) -> str:
+    """
+    DDL of a fact table with the columns of its fake row generator, an index
+    on the entity and one on the date, and the daily RANGE partitions of the
+    coverage window when the backfill manages them.
+    """
+    config = backfill.get_table_config(table)
+    sample = make_processor(1)._generate_fake_rows_by_date(table, TARGET_DATE)[0]
+    date_col = config.priority_date_cols[0]
+    entity_col = config.entity_column or next(
+        col for col in sample if col.endswith("_id") and col != date_col
+    )
+
+    columns = [
+        f"`{col}` {'DOUBLE' if col in DOUBLE_COLUMNS else 'INT'} DEFAULT NULL"
+        for col in sample
+    ]
+    columns.append(f"KEY `idx_{entity_col}` (`{entity_col}`)")
+    columns.append(f"KEY `idx_{date_col}` (`{date_col}`)")
+    ddl = f"CREATE TABLE `{table}` ({', '.join(columns)}) ENGINE=InnoDB"
+
+    if backfill.uses_daily_partitions(table):
+        partitions = ", ".join(
+            f"PARTITION p{upper} VALUES LESS THAN ({upper})" for upper in day_bounds
+        )
+        ddl += f" PARTITION BY RANGE (`{date_col}`) ({partitions})"
+    return ddl
+
+
+def daily_bounds() -> list:
+    """LESS THAN bounds of the days of every table coverage window."""
+    first = min(
+        backfill.generate_expected_dates(granularity)[0]
+        for granularity in ("month", "day", "hour")
+    )
+    last = backfill.generate_expected_dates("day")[-1] + timedelta(days=1)
+    first_upper = (int(first.timestamp()) // 86400 + 1) * 86400
+    return list(range(first_upper, int(last.timestamp()) + 86400, 86400))
+
+
+class LocalServer:
+    """Throwaway server listening on a Unix socket only."""
+
+    def __init__(self, args: argparse.Namespace, workdir: str):
+        self.args = args
+        self.datadir = os.path.join(workdir, "data")
+        self.socket = os.path.join(workdir, "mysqld.sock")
+        self.log = os.path.join(workdir, "mysqld.err")
+        self.process = None
+
+    def _server_options(self) -> list:
+        options = [
+            "--no-defaults",
+            f"--datadir={self.datadir}",
+            f"--socket={self.socket}",
+            "--skip-networking",
+            f"--pid-file={self.datadir}.pid",
+            f"--log-error={self.log}",
+            f"--innodb-buffer-pool-size={self.args.buffer_pool_mb}M",
+            "--local-infile=1",
+        ]
+        if os.geteuid() == 0:
+            options.append("--user=root")
+        return options + self.args.server_option
+
+    def start(self):
+        server = self.args.server_bin or find_binary("mariadbd", "mysqld")
+        if not server:
+            raise SystemExit("No mariadbd or mysqld found, use --server-bin")
+        install = find_binary("mariadb-install-db", "mysql_install_db")
+
+        os.makedirs(self.datadir)
+        if install:
+            command = [
+                install,
+                "--no-defaults",
+                f"--datadir={self.datadir}",
+                "--auth-root-authentication-method=normal",
+                "--skip-test-db",
+            ]
+        else:
+            command = [
+                server,
+                "--no-defaults",
+                "--initialize-insecure",
+                f"--datadir={self.datadir}",
+            ]
+        if os.geteuid() == 0:
+            command.append("--user=root")
+        subprocess.run(command, check=True, capture_output=True)
+
+        self.process = subprocess.Popen([server] + self._server_options())
+        deadline = time.time() + 60
+        while True:
+            try:
+                self.connect().close()
+                return
+            except mysql.connector.Error:
+                if self.process.poll() is not None or time.time() > deadline:
+                    raise SystemExit(f"Server did not start, see {self.log}")
+                time.sleep(0.5)
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.send_signal(signal.SIGTERM)
+            self.process.wait(timeout=120)
+
+    def connect(self, database: str = None):
+        return mysql.connector.connect(
+            unix_socket=self.socket,
+            user="root",
+            password="",
+            database=database,
+            autocommit=True,
+        )
+
+    def cpu_seconds(self) -> float:
+        """User + system CPU time of the server process (Linux /proc)."""
+        with open(f"/proc/{self.process.pid}/stat", encoding="ascii") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    def questions(self) -> int:
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SHOW GLOBAL STATUS LIKE 'Questions'")
+            return int(cursor.fetchone()[1])
+        finally:
+            conn.close()
+
+
+def create_schema(server: LocalServer, tables: list, scale: int):
+    """Create the database, the tables and seed the dimensions."""
+    conn = server.connect()
+    cursor = conn.cursor()
+    cursor.execute(f"CREATE DATABASE {DATABASE}")
+    cursor.execute(f"USE {DATABASE}")
+
+    for ddl in DIMENSIONS_DDL:
+        cursor.execute(ddl)
+    bounds = daily_bounds()
+    for table in tables:
+        cursor.execute(fact_table_ddl(table, bounds))
+
+    side = max(round(scale ** (1 / 3)), 1)
+    seeds = {
+        "mod_bi_servicemetrics (id, metric_id, metric_name)": [
+            (i, i, "metric.1") for i in range(1, scale + 1)
+        ],
+        "mod_bi_hosts (id, host_id, host_name)": [
+            (i, i, f"host-{i}") for i in range(1, scale + 1)
+        ],
+        "mod_bi_services (id, service_id, service_description)": [
+            (i, i, f"service-{i}") for i in range(1, scale + 1)
+        ],
+        "mod_bam_reporting_ba (ba_id, ba_name)": [
+            (i, f"ba-{i}") for i in range(1, scale + 1)
+        ],
+        "mod_bi_hostgroups (id, hg_id, hg_name)": [
+            (i, i, f"hg-{i}") for i in range(1, side + 1)
+        ],
+        "mod_bi_hostcategories (id, hc_id, hc_name)": [
+            (i, i, f"hc-{i}") for i in range(1, side + 1)
+        ],
+        "mod_bi_servicecategories (id, sc_id, sc_name)": [
+            (i, i, f"sc-{i}") for i in range(1, side + 1)
+        ],
+        "mod_bi_liveservice (name, timeperiod_id)": [("24x7", 1)],
+    }
+    for target, rows in seeds.items():
+        placeholders = ", ".join(["%s"] * len(rows[0]))
+        for start in range(0, len(rows), 10000):
+            cursor.executemany(
+                f"INSERT INTO {target} VALUES ({placeholders})",
+                rows[start : start + 10000],
+            )
+    conn.close()
+
+
+def run_case(server: LocalServer, args, workdir: str, case: dict) -> dict:
+    """Empty the fact tables, run the backfill once and measure the server."""
+    conn = server.connect(DATABASE)
+    cursor = conn.cursor()
+    for table in args.tables + REFRESHED_TABLES:
+        cursor.execute(f"TRUNCATE TABLE `{table}`")
+    conn.close()
+
+    report_path = os.path.join(
+        workdir,
+        "report-{strategy}-p{parallel}-pool{pool_size}-b{batch_size}.json".format(
+            **case
+        ),
+    )
+    journal = os.path.join(workdir, "journal")
+    if os.path.exists(journal):
+        os.remove(journal)
+    argv = [
+        sys.executable,
+        backfill.__file__,
+        "--host",
+        "localhost",
+        "--socket",
+        server.socket,
+        "--user",
+        "root",
+        "--password",
+        "",
+        "--database",
+        DATABASE,
+        "--inject",
+        "--fake-data",
+        "--skip-hostname-sync",
+        "--parallel",
+        str(case["parallel"]),
+        "--journal",
+        journal,
+        "--report-json",
+        report_path,
+        "--pool-size",
+        str(case["pool_size"]),
+        "--batch-size",
+        str(case["batch_size"]),
+        "--tables",
+        *args.tables,
+        *STRATEGIES[case["strategy"]],
+        *args.backfill_option,
+    ]
+
+    questions = server.questions()
+    cpu = server.cpu_seconds()
+    start = time.perf_counter()
+    exitcode = subprocess.run(argv, cwd=workdir).returncode
+    wall = time.perf_counter() - start
+    cpu = server.cpu_seconds() - cpu
+    # The Questions status query itself is not counted
+    statements = server.questions() - questions - 1
+
+    if exitcode != 0 or not os.path.exists(report_path):
+        return {**case, "rows": 0, "seconds": round(wall, 3), "error": exitcode}
+    with open(report_path, encoding="utf-8") as f:
+        report = json.load(f)
+    return {
+        **case,
+        "rows": report["total_rows"],
+        "seconds": round(wall, 3),
+        "rows_per_s": round(report["total_rows"] / wall) if wall else 0,
+        "statements_per_s": round(statements / wall) if wall else 0,
+        "server_cpu_s": round(cpu, 2),
+        "server_cpu_pct": round(100 * cpu / wall) if wall else 0,
+        "failed": [
+            table
+            for table, result in report["tables"].items()
+            if str(result["status"]).startswith("ERROR")
+        ],
+        "report": report_path,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--scale", type=int, default=1000, help="Entities per dimension"
+    )
+    parser.add_argument("--tables", nargs="+", default=TABLES)
+    parser.add_argument(
+        "--strategies", nargs="+", choices=list(STRATEGIES), default=list(STRATEGIES)
+    )
+    parser.add_argument("--parallel", type=int, nargs="+", default=[1])
+    parser.add_argument(
+        "--pool-size", type=int, nargs="+", default=[backfill.POOL_SIZE]
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        nargs="+",
+        default=[0],
+        help="--batch-size of the backfill (0: keep the configured ones)",
+    )
+    parser.add_argument("--server-bin", help="mariadbd or mysqld binary")
+    parser.add_argument(
+        "--server-option",
+        action="append",
+        default=[],
+        help="Extra server option, e.g. --server-option=--innodb-flush-log-at-trx-commit=2",
+    )
+    parser.add_argument(
+        "--backfill-option",
+        action="append",
+        default=[],
+        help="Extra backfill option, e.g. --backfill-option=--generator=numpy",
+    )
+    parser.add_argument("--buffer-pool-mb", type=int, default=1024)
+    parser.add_argument("--workdir", help="Server directory (default: a temporary one)")
+    parser.add_argument("--keep", action="store_true", help="Keep the server directory")
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    unknown = sorted(set(args.tables) - set(TABLES))
+    if unknown:
+        parser.error(f"No fake data generator for {', '.join(unknown)}")
+    maxsize = mysql.connector.pooling.CNX_POOL_MAXSIZE
+    if any(not 1 <= size <= maxsize for size in args.pool_size):
+        parser.error(f"--pool-size must be between 1 and {maxsize}")
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="mbi_e2e_")
+    os.makedirs(workdir, exist_ok=True)
+    server = LocalServer(args, workdir)
+    results = []
+    try:
+        server.start()
+        create_schema(server, args.tables, args.scale)
+        reports = os.path.join(workdir, "reports")
+        os.makedirs(reports, exist_ok=True)
+
+        for strategy, parallel, pool_size, batch_size in product(
+            args.strategies, args.parallel, args.pool_size, args.batch_size
+        ):
+            case = {
+                "strategy": strategy,
+                "parallel": parallel,
+                "pool_size": pool_size,
+                "batch_size": batch_size,
+            }
+            result = run_case(server, args, reports, case)
+            results.append(result)
+            if "error" in result:
+                print(f"{strategy:15} parallel {parallel:2} failed, see the log")
+                continue
+            print(
+                f"{strategy:15} parallel {parallel:2} pool {pool_size:3} "
+                f"batch {batch_size or 'cfg':>6} | {result['rows']:>10} rows "
+                f"{result['rows_per_s']:>9} rows/s {result['statements_per_s']:>7} "
+                f"stmts/s | server CPU {result['server_cpu_s']:8.2f}s "
+                f"({result['server_cpu_pct']}%)"
+                + (
+                    f" | failed: {', '.join(result['failed'])}"
+                    if result["failed"]
+                    else ""
+                )
+            )
+    finally:
+        server.stop()
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
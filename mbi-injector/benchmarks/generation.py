@@ -0,0 +1,164 @@
+"""
+Throughput benchmark of the hot loops of the backfill: fake row generation
+by table family, _transform_row, generate_bi_time_rows and the VALUES
+building of _insert_to_database, with synthetic dimension sizes.
+
+No database is needed, dimension IDs are synthesized and statements go to
+a stub cursor.
+
+    python3 benchmarks/generation.py --entities 1000 10000 100000
+    python3 benchmarks/generation.py --json after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fill_missing_dates import np  # noqa: E402
+from offline import make_processor, make_writer  # noqa: E402
+
+# One table per family, generated for TARGET_DATE
+FAMILIES = {
+    "availability": "mod_bi_serviceavailability",
+    "stateevents": "mod_bi_servicestateevents",
+    "metric": "mod_bi_metricdailyvalue",
+    "centile": "mod_bi_metriccentiledailyvalue",
+    "monthly hg": "mod_bi_hgservicemonthavailability",
+}
+TARGET_DATE = datetime(2025, 6, 1, tzinfo=timezone.utc)
+SCHEMA = {"auto_increment": [], "date_columns": ["start_time", "end_time"]}
+
+
+def bench_generate(table: str, columnar: bool = False):
+    def setup(entities: int):
+        processor = make_processor(entities)
+        if columnar:
+            return lambda: len(
+                processor._generate_fake_columns_by_date(table, TARGET_DATE)
+            )
+        return lambda: len(processor._generate_fake_rows_by_date(table, TARGET_DATE))
+
+    return setup
+
+
+def bench_transform(entities: int):
+    processor = make_processor(entities)
+    rows = processor._generate_fake_rows_by_date(
+        FAMILIES["stateevents"], TARGET_DATE - timedelta(days=30)
+    )
+
+    def run():
+        for row in rows:
+            processor._transform_row(row, SCHEMA, TARGET_DATE)
+        return len(rows)
+
+    return run
+
+
+def bench_bi_time(entities: int):
+    processor = make_processor(0)
+    days = [TARGET_DATE + timedelta(days=i) for i in range(max(entities // 24, 1))]
+    return lambda: len(processor.generate_bi_time_rows(days))
+
+
+def bench_values(entities: int):
+    """_insert_to_database itself, its statements executed by a stub cursor."""
+    rows = make_processor(entities)._generate_fake_rows_by_date(
+        FAMILIES["availability"], TARGET_DATE
+    )
+    writer = make_writer("bench", list(rows[0]))
+    return lambda: writer._insert_to_database("bench", rows)
+
+
+def benchmarks():
+    """Benchmark name -> setup(entities) returning the timed callable."""
+    result = {
+        f"generate {family}": bench_generate(table)
+        for family, table in FAMILIES.items()
+    }
+    if np is not None:
+        result["generate availability (numpy)"] = bench_generate(
+            FAMILIES["availability"], columnar=True
+        )
+        result["generate metric (numpy)"] = bench_generate(
+            FAMILIES["metric"], columnar=True
+        )
+    result["_transform_row"] = bench_transform
+    result["generate_bi_time_rows"] = bench_bi_time
+    result["_insert_to_database"] = bench_values
+    return result
+
+
+def measure(setup, entities: int, repeat: int) -> dict:
+    """
+    Best time of `repeat` runs, then peak allocation of a traced run. The
+    setup (dimension IDs, source rows) is neither timed nor traced.
+    """
+    run = setup(entities)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    run = setup(entities)
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "rows": rows,
+        "seconds": round(best, 4),
+        "rows_per_s": round(rows / best) if best else 0,
+        "peak_bytes": peak,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--entities", type=int, nargs="+", default=[1000, 10000, 100000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", help="Run the benchmarks whose name contains this")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Results file of a previous run")
+    args = parser.parse_args()
+
+    previous = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+
+    results = {}
+    for name, setup in benchmarks().items():
+        if args.only and args.only not in name:
+            continue
+        for entities in args.entities:
+            key = f"{name} @{entities}"
+            result = results[key] = measure(setup, entities, args.repeat)
+            line = (
+                f"{key:40} {result['rows']:>9} rows  "
+                f"{result['rows_per_s']:>10} rows/s  "
+                f"peak {result['peak_bytes'] / 1024 / 1024:8.1f} MB"
+            )
+            if key in previous and previous[key]["rows_per_s"]:
+                change = result["rows_per_s"] / previous[key]["rows_per_s"] - 1
+                line += f"  {change:+.0%} rows/s"
+            print(line)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Stand-ins shared by the benchmarks which need no database: backfill objects
+built without connecting, and a connection manager whose cursors only count
+the statements they are given.
+"""
+
+import logging
+import os
+import sys
+from array import array
+from contextlib import contextmanager
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fill_missing_dates import (  # noqa: E402
+    DataProcessor,
+    DataWriter,
+    DimensionSnapshot,
+    logger,
+)
+
+# Benchmarks only print their own results
+logger.setLevel(logging.WARNING)
+
+
+class StubCursor:
+    """Cursor answering DESCRIBE with the stub columns, other statements with nothing."""
+
+    def __init__(self, conn_mgr: "StubConnectionManager"):
+        self.conn_mgr = conn_mgr
+        self.rowcount = 0
+        self._rows = []
+
+    def execute(self, operation: str, params=None):
+        self.conn_mgr.statements += 1
+        if operation.startswith("DESCRIBE"):
+            self._rows = [(col,) for col in self.conn_mgr.columns]
+        else:
+            self._rows = []
+            self.rowcount = len(params) if params else 0
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+
+class StubConnection:
+    def __init__(self, conn_mgr: "StubConnectionManager"):
+        self.conn_mgr = conn_mgr
+
+    def cursor(self, *args, **kwargs) -> StubCursor:
+        return StubCursor(self.conn_mgr)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class StubConnectionManager:
+    """ConnectionManager stand-in: every table has the given columns."""
+
+    def __init__(self, columns: List[str] = ()):
+        self.columns = list(columns)
+        self.statements = 0
+
+    @contextmanager
+    def get_connection(self):
+        yield StubConnection(self)
+
+
+def make_dimensions(entities: int) -> DimensionSnapshot:
+    """
+    Snapshot with `entities` IDs per dimension. Monthly hg rows are the
+    product of hostgroups, host and service categories, which get the cube
+    root of the size so every family generates about `entities` rows.
+    """
+    dimensions = DimensionSnapshot("bench", "bench")
+    dimensions.liveservice_id = 1
+    side = max(round(entities ** (1 / 3)), 1)
+    for dimension in ("servicemetrics", "bas", "hosts", "services"):
+        dimensions._ids[dimension] = array("q", range(1, entities + 1))
+    for dimension in ("hostgroups", "hostcategories", "servicecategories"):
+        dimensions._ids[dimension] = array("q", range(1, side + 1))
+    dimensions._loaded = True
+    return dimensions
+
+
+def make_processor(entities: int = 0) -> DataProcessor:
+    processor = DataProcessor.__new__(DataProcessor)
+    processor.dimensions = make_dimensions(entities)
+    processor.conn_mgr = None
+    return processor
+
+
+def make_writer(table: str = "bench", columns: List[str] = ()) -> DataWriter:
+    """
+    Injecting DataWriter on a StubConnectionManager, the schema of `table`
+    cached: no date column (no partitions) and no unique index.
+    """
+    writer = DataWriter(StubConnectionManager(columns), inject_mode=True)
+    writer.table_analyzer._schema_cache[table] = {
+        "columns": list(columns),
+        "auto_increment": [],
+        "date_columns": [],
+        "primary_date_column": None,
+        "unique_indexes": {},
+    }
+    return writer
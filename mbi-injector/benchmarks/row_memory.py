@@ -0,0 +1,97 @@
+"""
+Memory benchmark of the real-data copy path: per-row dicts (dictionary cursor,
+_transform_row copy, writer re-projection) versus RowBatch tuples.
+
+No database is needed, source rows are synthesized.
+
+    python3 benchmarks/row_memory.py --rows 500000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fill_missing_dates import DataWriter, RowBatch  # noqa: E402
+from offline import make_processor, make_writer  # noqa: E402
+
+COLUMNS = [
+    "modbiservice_id",
+    "modbiliveservice_id",
+    "state",
+    "start_time",
+    "end_time",
+    "duration",
+    "sla_duration",
+    "ack_time",
+    "last_update",
+]
+SCHEMA = {"auto_increment": [], "date_columns": ["start_time", "end_time"]}
+TARGET_DATE = datetime(2025, 6, 1, tzinfo=timezone.utc)
+BATCH_SIZE = 15000
+
+
+def source_tuples(count: int):
+    return [
+        (i, 1, random.randint(0, 3), 1746057600, 1746057700, 100, 90, 0, 1)
+        for i in range(count)
+    ]
+
+
+def consume(writer: DataWriter, rows):
+    """Drain the writer projection in batch_size chunks, as the INSERT path."""
+    values = writer._iter_row_values("bench", rows, COLUMNS, [])
+    batch = []
+    for row_values in values:
+        batch.append(row_values)
+        if len(batch) == BATCH_SIZE:
+            params = [value for row in batch for value in row]
+            batch = []
+    if batch:
+        params = [value for row in batch for value in row]
+    return params
+
+
+def run_dicts(count: int):
+    rows = [dict(zip(COLUMNS, row)) for row in source_tuples(count)]
+    processor = make_processor()
+    transformed = [processor._transform_row(row, SCHEMA, TARGET_DATE) for row in rows]
+    consume(make_writer(), transformed)
+
+
+def run_batch(count: int):
+    batch = RowBatch(COLUMNS, source_tuples(count))
+    transformed = make_processor()._transform_batch(batch, SCHEMA, TARGET_DATE)
+    consume(make_writer(), transformed)
+
+
+def measure(name: str, func, count: int):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(count)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:12} {count:>9} rows  peak {peak / 1024 / 1024:8.1f} MB  {elapsed:6.2f}s"
+    )
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500000)
+    args = parser.parse_args()
+
+    before = measure("dict rows", run_dicts, args.rows)
+    after = measure("RowBatch", run_batch, args.rows)
+    print(f"peak memory ratio: {before / after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
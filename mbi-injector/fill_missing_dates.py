@@ -1,22 +1,52 @@
 import argparse
+import bisect
+import cProfile
 import concurrent.futures
+import functools
+import gzip
+import hashlib
+import io
+import json
 import logging
+import math
 import os
+import pickle
+import pstats
+import queue
 import random
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
 import threading
 import time
+import tracemalloc
 import zoneinfo
-from contextlib import contextmanager
-from dataclasses import dataclass
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict, deque
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
-from itertools import product
-from typing import Any, Dict, List, Optional, Set, Tuple
+from itertools import count, islice, product
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 import mysql.connector
 import pytz
 from mysql.connector import pooling
 from tqdm import tqdm
 
+try:
+    import numpy as np
+except ImportError:  # optional, only needed for --generator numpy
+    np = None
+
+try:
+    import zstandard
+except ImportError:  # optional, only needed for --dump-compression zstd
+    zstandard = None
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - [%(processName)s] %(message)s",
@@ -35,10 +65,19 @@ TZ_INFO = zoneinfo.ZoneInfo("UTC")
 class TableConfig:
     name: str
     batch_size: int = 15000
-    fetch_limit: int = 500000
+    fetch_chunk_size: int = 50000
     num_raws_returned: int = 1
     priority_date_cols: List[str] = None
     unique_key_strategy: List[str] = None
+    server_copy: bool = True
+    # Apply BULK_SESSION_SETTINGS around writes when --bulk-session is set
+    bulk_session: bool = True
+    # Drop secondary indexes before the load and rebuild them afterwards,
+    # when --rebuild-indexes is set
+    rebuild_indexes: bool = False
+    # Column and DimensionSnapshot IDs of the entities, for --coverage-mode entity
+    entity_column: str = None
+    entity_dimension: str = None
 
 
 TABLES_CONFIG = [
@@ -46,6 +85,8 @@ TABLES_CONFIG = [
         "mod_bam_reporting_ba_availabilities",
         priority_date_cols=["time_id", "start_time"],
         unique_key_strategy=["ba_id", "time_id"],
+        entity_column="ba_id",
+        entity_dimension="bas",
     ),
     TableConfig(
         "mod_bam_reporting_ba_events_durations",
@@ -75,6 +116,8 @@ TABLES_CONFIG = [
             "liveservice_id",
             "time_id",
         ],
+        entity_column="modbihost_id",
+        entity_dimension="hosts",
     ),
     TableConfig(
         "mod_bi_serviceavailability",
@@ -84,6 +127,8 @@ TABLES_CONFIG = [
             "liveservice_id",
             "time_id",
         ],
+        entity_column="modbiservice_id",
+        entity_dimension="services",
     ),
     TableConfig(
         "mod_bi_hoststateevents",
@@ -104,6 +149,9 @@ TABLES_CONFIG = [
             "start_time",
             "end_time",
         ],
+        entity_column="modbiservice_id",
+        entity_dimension="services",
+        rebuild_indexes=True,
     ),
     TableConfig(
         "mod_bi_hgmonthavailability",
@@ -134,6 +182,8 @@ TABLES_CONFIG = [
             "liveservice_id",
             "time_id",
         ],
+        entity_column="servicemetric_id",
+        entity_dimension="servicemetrics",
     ),
     TableConfig(
         "mod_bi_metrichourlyvalue",
@@ -142,6 +192,9 @@ TABLES_CONFIG = [
             "servicemetric_id",
             "time_id",
         ],
+        entity_column="servicemetric_id",
+        entity_dimension="servicemetrics",
+        rebuild_indexes=True,
     ),
     TableConfig(
         "mod_bi_metricmonthcapacity",
@@ -151,6 +204,8 @@ TABLES_CONFIG = [
             "liveservice_id",
             "time_id",
         ],
+        entity_column="servicemetric_id",
+        entity_dimension="servicemetrics",
     ),
     TableConfig(
         "mod_bi_metriccentiledailyvalue",
@@ -160,6 +215,8 @@ TABLES_CONFIG = [
             "time_id",
             "liveservice_id",
         ],
+        entity_column="servicemetric_id",
+        entity_dimension="servicemetrics",
     ),
     TableConfig(
         "mod_bi_metriccentileweeklyvalue",
@@ -169,6 +226,8 @@ TABLES_CONFIG = [
             "time_id",
             "liveservice_id",
         ],
+        entity_column="servicemetric_id",
+        entity_dimension="servicemetrics",
     ),
     TableConfig(
         "mod_bi_metriccentilemonthlyvalue",
@@ -178,6 +237,8 @@ TABLES_CONFIG = [
             "time_id",
             "liveservice_id",
         ],
+        entity_column="servicemetric_id",
+        entity_dimension="servicemetrics",
     ),
 ]
 
@@ -200,6 +261,29 @@ MAX_RETRIES = 3
 POOL_SIZE = 8
 CONNECTION_TIMEOUT = 60
 MAX_WORKERS = 4
+DUMP_FILE_SIZE_MB = 1024
+DUMP_PACKET_SIZE = 16 * 1024 * 1024
+DUMP_QUEUE_SIZE = 64
+# Partitions needed by the SQL dumps, to be replayed before them
+PARTITIONS_DUMP_FILE = "partitions.sql"
+HOSTNAME_SYNC_CHUNK = 5000
+# Above this many existing keys, duplicate detection switches to a Bloom filter
+BLOOM_FILTER_THRESHOLD = 5_000_000
+BLOOM_FILTER_ERROR_RATE = 0.001
+SOURCE_CACHE_MB = 256
+SOURCE_CACHE_VALUE_BYTES = 40
+JOURNAL_FILE = "centreon_backfill.journal"
+# Session variables of --bulk-session; autocommit=0 groups each write call
+# (one chunk or date) in a single transaction
+BULK_SESSION_SETTINGS = {
+    "unique_checks": 0,
+    "foreign_key_checks": 0,
+    "autocommit": 0,
+}
+# Suffix of the shadow tables filled by --shadow-load before being merged in
+SHADOW_SUFFIX = "__new"
+# Status of a table whose secondary indexes could not be rebuilt
+INDEX_REBUILD_ERROR = "ERROR: secondary index rebuild failed"
 
 thread_local = threading.local()
 
@@ -219,10 +303,41 @@ class Config:
         self.metric_name = args.metric_name
         self.liveservice_name = args.liveservice_name
         self.truncate = args.truncate
+        self.coverage_mode = args.coverage_mode
+        self.writer = args.writer
+        self.dump_compression = args.dump_compression
+        self.dump_file_size = args.dump_file_size
+        self.dump_packet_size = args.dump_packet_size
+        self.unit_size = args.unit_size
+        self.pipeline_max_rows = args.pipeline_max_rows
+        # Each writer holds one pooled connection at a time, the producer two
+        # (source stream and existing keys)
+        self.pool_size = args.pool_size
+        self.pipeline_writers = min(args.pipeline_writers, self.pool_size - 2)
+        self.batch_size = args.batch_size
+        self.sync_hostnames = not args.skip_hostname_sync
+        self.generator = args.generator
+        self.copy_mode = args.copy_mode
+        self.source_cache_mb = args.source_cache_mb
+        self.source_cache_dir = None
+        self.resume = args.resume
+        self.journal = None if args.dry_run else args.journal
+        self.bulk_session = args.bulk_session
+        self.skip_binlog = args.skip_binlog
+        self.rebuild_indexes = args.rebuild_indexes
+        self.shadow_load = args.shadow_load and args.inject and not args.dry_run
+        self.sql_stats = args.sql_stats
+        self.explain_threshold_ms = args.explain_threshold_ms
+        # Each run profiles into its own subdirectory of --profile
+        self.profile_dir = (
+            os.path.join(args.profile, datetime.now().strftime("run-%Y%m%d-%H%M%S"))
+            if args.profile
+            else None
+        )
 
         self.pool_config = {
             "pool_name": "centreon_pool",
-            "pool_size": POOL_SIZE,
+            "pool_size": self.pool_size,
             "pool_reset_session": True,
             "host": self.host,
             "port": self.port,
@@ -236,6 +351,10 @@ class Config:
             "use_unicode": True,
             "raise_on_warnings": False,
         }
+        if args.socket:
+            self.pool_config["unix_socket"] = args.socket
+        if self.writer == "load-data":
+            self.pool_config["allow_local_infile"] = True
 
 
 class ConnectionManager:
@@ -245,6 +364,7 @@ class ConnectionManager:
         self.config = config
         self._pool = None
         self._lock = threading.Lock()
+        self._explain_conn = None
 
     def get_pool(self):
         if self._pool is None:
@@ -255,7 +375,8 @@ class ConnectionManager:
                             **self.config.pool_config
                         )
                         logger.info(
-                            f"Connection pool created with {POOL_SIZE} connections"
+                            f"Connection pool created with "
+                            f"{self.config.pool_size} connections"
                         )
                     except mysql.connector.Error as e:
                         logger.error(f"Pool creation error: {e}")
@@ -268,10 +389,11 @@ class ConnectionManager:
         pool = self.get_pool()
         conn = None
         try:
+            # Only getting the connection is retried: errors of the caller
+            # propagate as they are
             for attempt in range(MAX_RETRIES):
                 try:
                     conn = pool.get_connection()
-                    yield conn
                     break
                 except mysql.connector.Error as e:
                     if attempt == MAX_RETRIES - 1:
@@ -280,20 +402,114 @@ class ConnectionManager:
                         )
                         raise
                     time.sleep(2**attempt)
-                    continue
+            if self.config.sql_stats:
+                yield InstrumentedConnection(conn, self)
+            else:
+                yield conn
         finally:
             if conn and conn.is_connected():
                 conn.close()
 
+    def explain(self, operation: str, params: Any = None) -> Optional[List[Dict]]:
+        """
+        EXPLAIN a statement on a connection of its own, outside the pool, so
+        that the connection which ran it may still hold an unread result.
+        """
+        with self._lock:
+            try:
+                if self._explain_conn is None or not self._explain_conn.is_connected():
+                    self._explain_conn = mysql.connector.connect(
+                        **{
+                            key: value
+                            for key, value in self.config.pool_config.items()
+                            if not key.startswith("pool_")
+                        }
+                    )
+                cursor = self._explain_conn.cursor(dictionary=True)
+                cursor.execute(f"EXPLAIN {operation}", params)
+                return cursor.fetchall()
+            except mysql.connector.Error as e:
+                logger.debug(f"Unable to explain statement: {e}")
+                return None
+
+
+def to_tsv_line(values: List[Any]) -> bytes:
+    """
+    Encode values as a LOAD DATA line (tab separated, backslash escaped).
+    Bytes values are written as they are, through surrogateescape.
+    """
+    fields = []
+    for value in values:
+        if value is None:
+            fields.append("\\N")
+        elif isinstance(value, datetime):
+            fields.append(value.strftime("%Y-%m-%d %H:%M:%S"))
+        elif isinstance(value, bool):
+            fields.append(str(int(value)))
+        elif isinstance(value, float):
+            fields.append(repr(value))
+        else:
+            if isinstance(value, (bytes, bytearray)):
+                value = bytes(value).decode("utf-8", "surrogateescape")
+            fields.append(
+                str(value)
+                .replace("\\", "\\\\")
+                .replace("\t", "\\t")
+                .replace("\n", "\\n")
+                .replace("\r", "\\r")
+                .replace("\0", "\\0")
+            )
+    return ("\t".join(fields) + "\n").encode("utf-8", "surrogateescape")
+
+
+def to_sql_literal(value: Any) -> str:
+    """Render a value as a MySQL literal for SQL dumps."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, datetime):
+        return "'" + value.strftime("%Y-%m-%d %H:%M:%S") + "'"
+    if isinstance(value, (bytes, bytearray)):
+        return "X'" + bytes(value).hex() + "'" if value else "''"
+    escaped = (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("'", "\\'")
+        .replace("\0", "\\0")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\x1a", "\\Z")
+    )
+    return "'" + escaped + "'"
+
 
 def get_table_config(table_name: str) -> TableConfig:
-    """Retrieve table configuration."""
+    """Retrieve table configuration (shadow tables share their table one)."""
+    table_name = table_name.removesuffix(SHADOW_SUFFIX)
     for config in TABLES_CONFIG:
         if config.name == table_name:
             return config
     return TableConfig(table_name)
 
 
+def target_table(cfg: "Config", table_name: str) -> str:
+    """Table receiving the rows of a table: its shadow with --shadow-load."""
+    return table_name + SHADOW_SUFFIX if cfg.shadow_load else table_name
+
+
+def coverage_table(cfg: "Config", table_name: str) -> str:
+    """
+    Table whose stored rows decide what is missing: the live table, unless
+    --truncate replaces it with an empty shadow.
+    """
+    return target_table(cfg, table_name) if cfg.truncate else table_name
+
+
 def is_monthly_table(table_name: str) -> bool:
     """Determine if a table contains monthly data."""
     return "month" in table_name.lower()
@@ -304,6 +520,14 @@ def is_hourly_table(table_name: str) -> bool:
     return "hourly" in table_name.lower()
 
 
+def uses_daily_partitions(table_name: str) -> bool:
+    """Determine if daily partitions are managed by the backfill for a table."""
+    return (
+        "mod_bi_time" not in table_name.lower()
+        and "stateevents" not in table_name.lower()
+    )
+
+
 def add_months(dt: datetime, months: int) -> datetime:
     """Add months to a date robustly."""
     month = dt.month - 1 + months
@@ -349,12 +573,306 @@ def generate_expected_dates(granularity: str) -> List[datetime]:
     return dates
 
 
+def bucket_bounds(date: datetime, granularity: str) -> Tuple[int, int]:
+    """Return the [start, end) Unix timestamps of the bucket starting at date."""
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=TZ_INFO)
+
+    if granularity == "month":
+        start = date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        end = add_months(start, 1)
+    elif granularity == "hour":
+        start = date.replace(minute=0, second=0, microsecond=0)
+        end = start + timedelta(hours=1)
+    else:
+        start = date.replace(hour=0, minute=0, second=0, microsecond=0)
+        end = start + timedelta(days=1)
+
+    return int(start.timestamp()), int(end.timestamp())
+
+
+class RunMetrics:
+    """
+    Process-local timings and counters of the run phases, by table: calls,
+    seconds, rows, bytes and SQL statements. Work units drain them into
+    their result, and main merges them across the process pool.
+    """
+
+    def __init__(self):
+        self._tables: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._explains: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def add(self, table: str, phase: str, **counters: float):
+        table = table.removesuffix(SHADOW_SUFFIX)
+        with self._lock:
+            entry = self._tables.setdefault(table, {}).setdefault(phase, {})
+            for name, value in counters.items():
+                entry[name] = entry.get(name, 0) + value
+
+    @contextmanager
+    def timed(self, table: str, phase: str, **counters: float):
+        """Time a phase; the yielded dict collects counters set by the caller."""
+        start = time.perf_counter()
+        counters = dict(counters)
+        try:
+            yield counters
+        finally:
+            self.add(
+                table,
+                phase,
+                calls=1,
+                seconds=time.perf_counter() - start,
+                **counters,
+            )
+
+    def explain(self, shape: str, record: Dict):
+        """Keep the EXPLAIN of the slowest statement seen for a shape."""
+        with self._lock:
+            RunMetrics._keep_slowest(self._explains, shape, record)
+
+    def absorb(self, drained: Dict):
+        """Add back metrics drained in the same process."""
+        for table, phases in drained["tables"].items():
+            for phase, counters in phases.items():
+                self.add(table, phase, **counters)
+        for shape, record in drained.get("explains", {}).items():
+            self.explain(shape, record)
+
+    def drain(self) -> Dict:
+        """Return and reset the metrics collected by this process."""
+        with self._lock:
+            tables, self._tables = self._tables, {}
+            explains, self._explains = self._explains, {}
+        return {"pid": os.getpid(), "tables": tables, "explains": explains}
+
+    @staticmethod
+    def _keep_slowest(explains: Dict[str, Dict], shape: str, record: Dict):
+        if record["ms"] > explains.get(shape, {}).get("ms", -1):
+            explains[shape] = record
+
+    @staticmethod
+    def merge(report: Dict, drained: Dict) -> Dict:
+        """Sum drained metrics into a run report, by table and by worker."""
+        worker = report.setdefault("workers", {}).setdefault(str(drained["pid"]), {})
+        for table, phases in drained["tables"].items():
+            for phase, counters in phases.items():
+                merged = (
+                    report.setdefault("tables", {})
+                    .setdefault(table, {})
+                    .setdefault(phase, {})
+                )
+                targets = [merged]
+                if table != SQL_STATS_TABLE:
+                    targets.append(worker.setdefault(phase, {}))
+                for target in targets:
+                    for name, value in counters.items():
+                        target[name] = target.get(name, 0) + value
+        for shape, record in drained.get("explains", {}).items():
+            RunMetrics._keep_slowest(report.setdefault("explains", {}), shape, record)
+        return report
+
+    @staticmethod
+    def phase_totals(report: Dict) -> Dict[str, Dict[str, float]]:
+        """Counters of each phase summed over the tables of a run report."""
+        totals = {}
+        for table, phases in report.get("tables", {}).items():
+            if table == SQL_STATS_TABLE:
+                continue
+            for phase, counters in phases.items():
+                total = totals.setdefault(phase, {})
+                for name, value in counters.items():
+                    total[name] = total.get(name, 0) + value
+        return totals
+
+
+METRICS = RunMetrics()
+
+# Phases timing a whole step which other phases also time in part: the
+# summary lists them apart so that their seconds are not added twice
+ENCLOSING_PHASES = ("prepare_table", "write_bulk", "write_default")
+
+# Pseudo table of the run metrics holding the statement latencies (--sql-stats)
+SQL_STATS_TABLE = "(sql)"
+LATENCY_BUCKETS_PER_DOUBLING = 4
+
+_SHAPE_TABLE_RE = re.compile(
+    r"\b(?:FROM|INTO(?:\s+TABLE)?|TABLE(?:\s+IF\s+(?:NOT\s+)?EXISTS)?|UPDATE|JOIN)"
+    r"\s+`?([\w.]+)`?",
+    re.IGNORECASE,
+)
+_EXPLAINED_SHAPES: Set[str] = set()
+
+
+def statement_shape(operation: str) -> str:
+    """
+    Normalise a statement to its verb, table and kind, e.g.
+    "INSERT mod_bi_serviceavailability (batch)" or "SELECT data_bin (probe)",
+    so latencies group by query shape whatever the values.
+    """
+    head = operation[:2000]
+    words = head.split(None, 2)
+    if not words:
+        return "?"
+    verb = words[0].upper()
+    if verb in ("ALTER", "CREATE", "DROP", "LOAD", "RENAME", "SHOW") and len(words) > 1:
+        verb = f"{verb} {words[1].upper()}"
+
+    match = _SHAPE_TABLE_RE.search(head)
+    shape = verb
+    if match:
+        shape = f"{verb} {match.group(1).removesuffix(SHADOW_SUFFIX)}"
+
+    upper = head.upper()
+    kind = None
+    if verb in ("INSERT", "REPLACE"):
+        values = upper.find("VALUES")
+        if values >= 0:
+            multi_row = operation.find("), (", values, values + 8000) >= 0
+            kind = "batch" if multi_row else "row"
+        elif "SELECT" in upper:
+            kind = "select"
+    elif verb == "SELECT":
+        if upper.rstrip().endswith("LIMIT 1"):
+            kind = "probe"
+        elif "COUNT(" in upper:
+            kind = "count"
+        elif "GROUP BY" in upper:
+            kind = "grouped"
+        elif "WHERE" not in upper:
+            kind = "scan"
+    return f"{shape} ({kind})" if kind else shape
+
+
+def _is_explainable(shape: str) -> bool:
+    """Only reads are explained: extended INSERT plans say nothing of their cost."""
+    verb = shape.split(None, 1)[0]
+    return verb in ("SELECT", "UPDATE", "DELETE") or shape.endswith("(select)")
+
+
+def latency_bucket(seconds: float) -> str:
+    """Histogram counter of a latency: log-scale buckets, 4 per doubling."""
+    ms = max(seconds * 1000, 0.001)
+    return f"b{math.ceil(math.log2(ms) * LATENCY_BUCKETS_PER_DOUBLING)}"
+
+
+def latency_percentiles(
+    counters: Dict[str, float], percentiles: Tuple[int, ...] = (50, 95, 99)
+) -> Dict[str, float]:
+    """Percentiles in ms (upper bound of their bucket) of a latency histogram."""
+    buckets = sorted(
+        (int(name[1:]), value) for name, value in counters.items() if name[0] == "b"
+    )
+    total = sum(value for _, value in buckets)
+    result = {}
+    for percentile in percentiles:
+        threshold = total * percentile / 100
+        seen = 0
+        for index, value in buckets:
+            seen += value
+            if seen >= threshold:
+                ms = 2 ** (index / LATENCY_BUCKETS_PER_DOUBLING)
+                result[f"p{percentile}_ms"] = round(ms, 3)
+                break
+    return result
+
+
+class InstrumentedCursor:
+    """
+    Cursor proxy timing each statement into the latency histogram of its
+    shape (--sql-stats). Unbuffered cursors are timed up to the first row.
+    Statements slower than --explain-threshold-ms get an EXPLAIN, once per
+    shape and process.
+    """
+
+    def __init__(self, cursor, conn_mgr: ConnectionManager):
+        self._cursor = cursor
+        self._conn_mgr = conn_mgr
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            self._record(operation, params, time.perf_counter() - start)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            self._record(operation, None, time.perf_counter() - start)
+
+    def _record(self, operation, params, elapsed: float):
+        if isinstance(operation, bytes):
+            operation = operation.decode("utf-8", "replace")
+        shape = statement_shape(operation)
+        METRICS.add(
+            SQL_STATS_TABLE,
+            shape,
+            calls=1,
+            seconds=elapsed,
+            **{latency_bucket(elapsed): 1},
+        )
+
+        threshold = self._conn_mgr.config.explain_threshold_ms
+        if (
+            not threshold
+            or elapsed * 1000 < threshold
+            or shape in _EXPLAINED_SHAPES
+            or not _is_explainable(shape)
+            or (params is None and "%s" in operation)
+        ):
+            return
+        _EXPLAINED_SHAPES.add(shape)
+
+        plan = self._conn_mgr.explain(operation, params)
+        if plan is None:
+            return
+        logger.warning(
+            f"Slow statement {shape}: {elapsed * 1000:.0f} ms, EXPLAIN:\n"
+            + "\n".join(
+                "  " + ", ".join(f"{key}={value}" for key, value in row.items())
+                for row in plan
+            )
+        )
+        METRICS.explain(
+            shape,
+            {
+                "ms": round(elapsed * 1000, 1),
+                "statement": operation[:1000],
+                "plan": plan,
+            },
+        )
+
+
+class InstrumentedConnection:
+    """Pooled connection proxy handing out InstrumentedCursor (--sql-stats)."""
+
+    def __init__(self, conn, conn_mgr: ConnectionManager):
+        self._conn = conn
+        self._conn_mgr = conn_mgr
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._conn.cursor(*args, **kwargs), self._conn_mgr)
+
+
 class TableAnalyzer:
     """Class for analyzing table structure."""
 
     def __init__(self, connection_manager: ConnectionManager):
         self.conn_mgr = connection_manager
         self._schema_cache = {}
+        self._partition_cache = {}
 
     def get_table_schema(self, table: str) -> Dict:
         """Retrieve and cache table schema."""
@@ -373,6 +891,8 @@ class TableAnalyzer:
             "primary_key": [],
             "auto_increment": [],
             "indexes": {},
+            "unique_indexes": {},
+            "index_definitions": {},
             "primary_date_column": None,
         }
 
@@ -410,6 +930,25 @@ class TableAnalyzer:
                 if key_name not in schema["indexes"]:
                     schema["indexes"][key_name] = []
                 schema["indexes"][key_name].append(idx["Column_name"])
+                if not int(idx["Non_unique"]):
+                    schema["unique_indexes"].setdefault(key_name, []).append(
+                        idx["Column_name"]
+                    )
+
+                definition = schema["index_definitions"].setdefault(
+                    key_name,
+                    {
+                        "unique": not int(idx["Non_unique"]),
+                        "type": idx.get("Index_type") or "BTREE",
+                        "columns": [],
+                    },
+                )
+                column_sql = f"`{idx['Column_name']}`"
+                if idx.get("Sub_part"):
+                    column_sql += f"({idx['Sub_part']})"
+                if idx.get("Collation") == "D":
+                    column_sql += " DESC"
+                definition["columns"].append(column_sql)
 
             logger.debug(
                 f"[{table}] Schema analyzed: {len(schema['columns'])} columns, "
@@ -421,96 +960,211 @@ class TableAnalyzer:
 
         return schema
 
-    def get_existing_partitions(self, table: str) -> List[int]:
+    def has_unique_index_within(self, table: str, columns: List[str]) -> bool:
+        """
+        Tell if a unique index of the table only uses the given columns, so that
+        the server itself rejects any row duplicating those columns.
+        """
+        if not columns:
+            return False
+        schema = self.get_table_schema(table)
+        return any(
+            set(index_cols) <= set(columns)
+            for index_cols in schema.get("unique_indexes", {}).values()
+        )
+
+    def secondary_index_clauses(self, table: str) -> Dict[str, str]:
+        """
+        ALTER TABLE clauses recreating the indexes that can be dropped during
+        a load: not the primary key, not the unique indexes (duplicates must
+        still be rejected) and not the ones led by the primary date column,
+        which serve the per-date scans of the load itself.
+        """
+        schema = self.get_table_schema(table)
+        date_col = schema["primary_date_column"]
+        clauses = {}
+
+        for name, definition in schema.get("index_definitions", {}).items():
+            if name == "PRIMARY" or definition["unique"]:
+                continue
+            if date_col and definition["columns"][0] == f"`{date_col}`":
+                continue
+            kind = (
+                f"{definition['type']} INDEX"
+                if definition["type"] in ("FULLTEXT", "SPATIAL")
+                else "INDEX"
+            )
+            clauses[name] = f"ADD {kind} `{name}` ({', '.join(definition['columns'])})"
+
+        return clauses
+
+    def drop_index(self, table: str, name: str) -> bool:
+        """Drop an index, False when the server refuses (e.g. needed by a foreign key)."""
+        with self.conn_mgr.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"ALTER TABLE `{table}` DROP INDEX `{name}`")
+                return True
+            except mysql.connector.Error as e:
+                logger.warning(f"[{table}] Cannot drop index {name}: {e}")
+                return False
+
+    def add_indexes(self, table: str, clauses: List[str]):
+        """Build several indexes with a single ALTER TABLE (one table rebuild)."""
+        with self.conn_mgr.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"ALTER TABLE `{table}` {', '.join(clauses)}")
+            except mysql.connector.Error as e:
+                logger.error(f"[{table}] Error rebuilding indexes: {e}")
+                raise
+
+    def get_partition_row_counts(self, table: str) -> Dict[int, int]:
         """
-        Retourne la liste des valeurs LESS THAN des partitions existantes.
+        Return the estimated row count (TABLE_ROWS) of each partition, keyed by
+        its LESS THAN value.
         """
-        partitions = []
+        counts = {}
         with self.conn_mgr.get_connection() as conn:
             cursor = conn.cursor(dictionary=True)
             cursor.execute(
                 """
-                SELECT PARTITION_NAME, PARTITION_DESCRIPTION
+                SELECT PARTITION_DESCRIPTION, TABLE_ROWS
                 FROM INFORMATION_SCHEMA.PARTITIONS
                 WHERE TABLE_SCHEMA = DATABASE()
                 AND TABLE_NAME = %s
                 AND PARTITION_DESCRIPTION IS NOT NULL
-                ORDER BY PARTITION_DESCRIPTION
             """,
                 (table,),
             )
             for row in cursor.fetchall():
                 try:
-                    val = int(row["PARTITION_DESCRIPTION"])
-                    partitions.append(val)
+                    counts[int(row["PARTITION_DESCRIPTION"])] = int(
+                        row["TABLE_ROWS"] or 0
+                    )
                 except (ValueError, TypeError):
                     continue
-        return sorted(partitions)
+        return counts
 
-    def create_partition_for_value(
-        self, table: str, target_value: int, step: int = 86400
-    ):
+    def get_partition_layout(self, table: str) -> Dict:
         """
-        Crée une partition pour couvrir target_value si aucune ne le couvre.
+        Retrieve and cache the RANGE partition layout of a table: sorted LESS
+        THAN boundaries and the name of the MAXVALUE partition, if any.
         """
-        existing = self.get_existing_partitions(table)
-        if any(target_value < p for p in existing):
-            logger.debug(
-                f"[{table}] A partition already exists for value {target_value}."
+        if table not in self._partition_cache:
+            layout = {"partitioned": False, "bounds": [], "maxvalue": None}
+            with self.conn_mgr.get_connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+                cursor.execute(
+                    """
+                    SELECT PARTITION_NAME, PARTITION_DESCRIPTION
+                    FROM INFORMATION_SCHEMA.PARTITIONS
+                    WHERE TABLE_SCHEMA = DATABASE()
+                    AND TABLE_NAME = %s
+                    AND PARTITION_NAME IS NOT NULL
+                """,
+                    (table,),
+                )
+                for row in cursor.fetchall():
+                    layout["partitioned"] = True
+                    description = row["PARTITION_DESCRIPTION"]
+                    if str(description).upper() == "MAXVALUE":
+                        layout["maxvalue"] = row["PARTITION_NAME"]
+                        continue
+                    try:
+                        layout["bounds"].append(int(description))
+                    except (ValueError, TypeError):
+                        continue
+            layout["bounds"].sort()
+            self._partition_cache[table] = layout
+        return self._partition_cache[table]
+
+    def invalidate_partition_layout(self, table: str):
+        self._partition_cache.pop(table, None)
+
+    def plan_daily_partitions(
+        self, table: str, min_value, max_value, step: int = 86400
+    ) -> List[int]:
+        """
+        Compute every missing daily boundary needed to cover the values between
+        min_value and max_value (timestamps or datetime).
+        """
+        layout = self.get_partition_layout(table)
+        if not layout["partitioned"]:
+            return []
+
+        if isinstance(min_value, datetime):
+            min_value = int(
+                datetime.combine(min_value.date(), datetime.min.time())
+                .replace(tzinfo=timezone.utc)
+                .timestamp()
+            )
+        if isinstance(max_value, datetime):
+            max_value = int(
+                datetime.combine(max_value.date(), datetime.min.time())
+                .replace(tzinfo=timezone.utc)
+                .timestamp()
             )
-            return
 
-        next_upper = ((target_value // step) + 1) * step
-        partition_name = f"p{next_upper}"
+        # RANGE partitions can only be appended above the highest boundary
+        highest = layout["bounds"][-1] if layout["bounds"] else None
+        first_upper = (int(min_value) // step + 1) * step
+        last_upper = (int(max_value) // step + 1) * step
+        if highest is not None:
+            first_upper = max(first_upper, highest + step - highest % step)
 
-        logger.info(
-            f"[{table}] Creating partition {partition_name} for target_value {target_value}, next_upper: {next_upper}"
+        return list(range(first_upper, last_upper + 1, step))
+
+    def partition_ddl(self, table: str, missing: List[int]) -> str:
+        """
+        ALTER TABLE statement adding the given daily boundaries, splitting the
+        MAXVALUE partition when there is one.
+        """
+        layout = self.get_partition_layout(table)
+        definitions = ", ".join(
+            f"PARTITION p{upper} VALUES LESS THAN ({upper})" for upper in missing
         )
 
-        alter_sql = f"""
-            ALTER TABLE `{table}`
-            ADD PARTITION (
-                PARTITION {partition_name}
-                VALUES LESS THAN ({next_upper})
+        if layout["maxvalue"]:
+            maxvalue = layout["maxvalue"]
+            return (
+                f"ALTER TABLE `{table}` REORGANIZE PARTITION `{maxvalue}` INTO "
+                f"({definitions}, PARTITION `{maxvalue}` VALUES LESS THAN MAXVALUE)"
             )
-        """
-        with self.conn_mgr.get_connection() as conn:
-            cursor = conn.cursor()
-            try:
-                cursor.execute(alter_sql)
-                conn.commit()
-                logger.info(
-                    f"[{table}] Partition '{partition_name}' created for value < {next_upper}"
-                )
-            except mysql.connector.Error as e:
-                logger.info(f"[{table}] {e}")
-                return
+        return f"ALTER TABLE `{table}` ADD PARTITION ({definitions})"
 
-    def ensure_partitions_for_range(self, table: str, min_value, max_value):
+    def ensure_partitions_for_range(
+        self, table: str, min_value, max_value, step: int = 86400
+    ):
         """
         Crée toutes les partitions journalières manquantes pour couvrir les valeurs
-        entre min_value et max_value (timestamps ou datetime).
+        entre min_value et max_value (timestamps ou datetime), en une seule
+        requête ALTER TABLE.
         """
-        # Normaliser en datetime
-        if isinstance(min_value, (int, float)):
-            min_value = datetime.utcfromtimestamp(min_value)
-        if isinstance(max_value, (int, float)):
-            max_value = datetime.utcfromtimestamp(max_value)
+        missing = self.plan_daily_partitions(table, min_value, max_value, step)
+        if not missing:
+            logger.debug(f"[{table}] Partitions already cover the requested range")
+            return
 
-        current = min_value.date()
-        end = max_value.date()
+        layout = self.get_partition_layout(table)
+        alter_sql = self.partition_ddl(table, missing)
 
-        logger.info(f"[{table}] Checking partitions for range {current} -> {end}")
+        logger.info(
+            f"[{table}] Creating {len(missing)} partitions "
+            f"p{missing[0]} -> p{missing[-1]}"
+        )
 
-        while current <= end:
-            # Prendre le timestamp de minuit pour ce jour
-            ts = int(
-                datetime.combine(current, datetime.min.time())
-                .replace(tzinfo=timezone.utc)
-                .timestamp()
-            )
-            self.create_partition_for_value(table, ts, step=86400)
-            current += timedelta(days=1)
+        with METRICS.timed(
+            table, "partitions", statements=1
+        ), self.conn_mgr.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(alter_sql)
+                conn.commit()
+                layout["bounds"] = sorted(layout["bounds"] + missing)
+            except mysql.connector.Error as e:
+                logger.info(f"[{table}] {e}")
+                self.invalidate_partition_layout(table)
 
     def add_primary_key_to_hoststateevents(conn_mgr):
         """
@@ -594,6 +1248,495 @@ class TableAnalyzer:
                 conn.rollback()
 
 
+class DimensionSnapshot:
+    """
+    Run-level snapshot of the dimension IDs used to generate fake rows.
+
+    IDs are loaded once into compact int arrays and shipped to every table
+    worker, instead of being re-queried for each generated date.
+    """
+
+    ID_QUERIES = {
+        "servicemetrics": (
+            "SELECT id FROM mod_bi_servicemetrics WHERE metric_name = %s",
+            "metric_name",
+        ),
+        "bas": (
+            "SELECT ba_id FROM mod_bam_reporting_ba WHERE ba_id IS NOT NULL",
+            None,
+        ),
+        "hosts": ("SELECT id FROM mod_bi_hosts WHERE id IS NOT NULL", None),
+        "services": ("SELECT id FROM mod_bi_services WHERE id IS NOT NULL", None),
+        "hostgroups": ("SELECT id FROM mod_bi_hostgroups WHERE id IS NOT NULL", None),
+        "hostcategories": (
+            "SELECT id FROM mod_bi_hostcategories WHERE id IS NOT NULL",
+            None,
+        ),
+        "servicecategories": (
+            "SELECT id FROM mod_bi_servicecategories WHERE id IS NOT NULL",
+            None,
+        ),
+    }
+
+    def __init__(self, metric_name: str, liveservice_name: str):
+        self.metric_name = metric_name
+        self.liveservice_name = liveservice_name
+        self.liveservice_id: Optional[int] = None
+        self._ids: Dict[str, array] = {}
+        self._loaded = False
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def ids(self, dimension: str) -> array:
+        """Return the ID array of a dimension (empty if not loaded)."""
+        return self._ids.get(dimension, array("q"))
+
+    def load(self, conn_mgr: ConnectionManager) -> "DimensionSnapshot":
+        """Load the snapshot unless it is already loaded."""
+        if not self._loaded:
+            self.refresh(conn_mgr)
+        return self
+
+    def refresh(self, conn_mgr: ConnectionManager) -> "DimensionSnapshot":
+        """(Re)load every dimension ID set using a single connection."""
+        start = time.time()
+        ids = {}
+
+        with conn_mgr.get_connection() as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.execute(
+                    "SELECT id FROM mod_bi_liveservice WHERE name = %s LIMIT 1",
+                    (self.liveservice_name,),
+                )
+                row = cursor.fetchone()
+                self.liveservice_id = row[0] if row else None
+            except mysql.connector.Error as e:
+                logger.error(
+                    f"Failed to fetch id for liveservice '{self.liveservice_name}': {e}"
+                )
+                self.liveservice_id = None
+
+            for dimension, (query, param) in self.ID_QUERIES.items():
+                params = (getattr(self, param),) if param else ()
+                try:
+                    cursor.execute(query, params)
+                    ids[dimension] = array("q", (r[0] for r in cursor.fetchall()))
+                except mysql.connector.Error as e:
+                    logger.error(f"Failed to fetch {dimension} IDs: {e}")
+                    ids[dimension] = array("q")
+
+        self._ids = ids
+        self._loaded = True
+
+        logger.info(
+            f"Dimension snapshot loaded in {time.time() - start:.2f}s: "
+            + ", ".join(f"{name}={len(values)}" for name, values in ids.items())
+        )
+        return self
+
+    def invalidate(self):
+        """Drop the loaded IDs so that the next load() re-queries them."""
+        self._ids = {}
+        self.liveservice_id = None
+        self._loaded = False
+
+
+class Batch(ABC):
+    """
+    Rows sharing one fixed column order, passed from the source to the writers
+    without building one dict per row.
+    """
+
+    columns: List[str]
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Return the number of rows."""
+
+    def has_column(self, name: str) -> bool:
+        return name in self.columns
+
+    @abstractmethod
+    def values(self, name: str) -> List[Any]:
+        """Return the values of a column as a list of native values."""
+
+    @abstractmethod
+    def iter_rows(self, columns: List[str]):
+        """Yield rows as tuples of native values in the given column order."""
+
+    @abstractmethod
+    def take(self, indices) -> "Batch":
+        """Return a new batch made of the given row indices."""
+
+    def to_dicts(self) -> List[Dict]:
+        return [dict(zip(self.columns, row)) for row in self.iter_rows(self.columns)]
+
+
+class RowBatch(Batch):
+    """
+    Row-major batch: a list of tuples in the column order of the source cursor.
+    Used for real data copied from the database.
+    """
+
+    def __init__(self, columns: List[str], rows: List[Tuple]):
+        self.columns = list(columns)
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def values(self, name: str) -> List[Any]:
+        idx = self.columns.index(name)
+        return [row[idx] for row in self.rows]
+
+    def iter_rows(self, columns: List[str]):
+        if columns == self.columns:
+            return iter(self.rows)
+        positions = [
+            self.columns.index(col) if col in self.columns else None for col in columns
+        ]
+        return (
+            tuple(None if pos is None else row[pos] for pos in positions)
+            for row in self.rows
+        )
+
+    def take(self, indices) -> "RowBatch":
+        return RowBatch(self.columns, [self.rows[idx] for idx in indices])
+
+    def transform(self, drop: Set[str], replace: Dict[str, Any]) -> "RowBatch":
+        """
+        Return a batch without the dropped columns, where int and datetime
+        values of the replaced columns are set to a new value.
+        """
+        kept = [idx for idx, col in enumerate(self.columns) if col not in drop]
+        replaced = {
+            idx: replace[col] for idx, col in enumerate(self.columns) if col in replace
+        }
+        if not replaced and len(kept) == len(self.columns):
+            return self
+
+        def new_value(row, idx):
+            value = row[idx]
+            if idx in replaced and isinstance(value, (int, datetime)):
+                return replaced[idx]
+            return value
+
+        return RowBatch(
+            [self.columns[idx] for idx in kept],
+            [tuple(new_value(row, idx) for idx in kept) for row in self.rows],
+        )
+
+
+class ColumnBatch(Batch):
+    """
+    Columnar batch of rows: one array per column, in a fixed column order.
+    Produced by the vectorized generator and consumed as is by the writers.
+    """
+
+    def __init__(self, columns: List[str], arrays: List[Any]):
+        self.columns = list(columns)
+        self.arrays = list(arrays)
+
+    def __len__(self) -> int:
+        return len(self.arrays[0]) if self.arrays else 0
+
+    def column(self, name: str):
+        return self.arrays[self.columns.index(name)]
+
+    def values(self, name: str) -> List[Any]:
+        return self.column(name).tolist()
+
+    def set_column(self, name: str, value: Any):
+        """Set a column to an array, or to a constant for every row."""
+        if np.isscalar(value) or value is None:
+            value = np.full(len(self), value, dtype=object if value is None else None)
+        if name in self.columns:
+            self.arrays[self.columns.index(name)] = value
+        else:
+            self.columns.append(name)
+            self.arrays.append(value)
+
+    def drop_columns(self, names):
+        kept = [i for i, col in enumerate(self.columns) if col not in set(names)]
+        self.columns = [self.columns[i] for i in kept]
+        self.arrays = [self.arrays[i] for i in kept]
+
+    def take(self, indices) -> "ColumnBatch":
+        indices = np.asarray(indices, dtype=np.int64)
+        return ColumnBatch(self.columns, [array[indices] for array in self.arrays])
+
+    def iter_rows(self, columns: List[str]):
+        size = len(self)
+        lists = [
+            self.column(col).tolist() if col in self.columns else [None] * size
+            for col in columns
+        ]
+        return zip(*lists)
+
+
+def column_values(rows, name: str) -> List[Any]:
+    """Return the non-null values of a column, for dict rows or a Batch."""
+    if isinstance(rows, Batch):
+        if not rows.has_column(name):
+            return []
+        return [value for value in rows.values(name) if value is not None]
+    return [row[name] for row in rows if row.get(name) is not None]
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter for tuples of existing unique key values."""
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_FILTER_ERROR_RATE):
+        capacity = max(capacity, 1)
+        self.num_bits = max(
+            int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8
+        )
+        self.num_hashes = max(int(self.num_bits / capacity * math.log(2)), 1)
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: Tuple):
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: Tuple):
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: Tuple) -> bool:
+        return all(
+            self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key)
+        )
+
+
+class ExistingKeys:
+    """
+    Unique keys already stored in a table for a time window, loaded with a
+    single range scan and used to filter candidate rows locally.
+    """
+
+    def __init__(self, key_cols: List[str]):
+        self.key_cols = key_cols
+        self._keys = set()
+        self.count = 0
+
+    def load(
+        self,
+        cursor,
+        table: str,
+        date_col: Optional[str],
+        min_value: Optional[int] = None,
+        max_value: Optional[int] = None,
+    ) -> "ExistingKeys":
+        """Load existing keys, restricted to [min_value, max_value] when possible."""
+        columns_sql = ", ".join(f"`{col}`" for col in self.key_cols)
+        params = ()
+
+        if date_col in self.key_cols and min_value is not None:
+            where_sql = f"WHERE `{date_col}` BETWEEN %s AND %s"
+            params = (min_value, max_value)
+            cursor.execute(f"SELECT COUNT(*) FROM `{table}` {where_sql}", params)
+        else:
+            where_sql = ""
+            cursor.execute(f"SELECT COUNT(*) FROM `{table}`")
+        expected = cursor.fetchone()[0]
+
+        if expected > BLOOM_FILTER_THRESHOLD:
+            logger.info(
+                f"[{table}] {expected} existing keys in window, using a Bloom filter"
+            )
+            self._keys = BloomFilter(expected)
+
+        cursor.execute(f"SELECT {columns_sql} FROM `{table}` {where_sql}", params)
+        while True:
+            chunk = cursor.fetchmany(50000)
+            if not chunk:
+                break
+            for key in chunk:
+                self._keys.add(tuple(key))
+            self.count += len(chunk)
+
+        METRICS.add(table, "existing_keys", statements=2, rows=self.count)
+        return self
+
+    def key_of(self, row: Dict) -> Tuple:
+        return tuple(row.get(col) for col in self.key_cols)
+
+    def __contains__(self, row: Dict) -> bool:
+        return self.key_of(row) in self._keys
+
+    def filter_new(self, rows: List[Dict]) -> List[Dict]:
+        """Keep the rows whose key is not stored yet."""
+        if isinstance(rows, Batch):
+            keep = [
+                idx
+                for idx, key in enumerate(rows.iter_rows(self.key_cols))
+                if key not in self._keys
+            ]
+            return rows if len(keep) == len(rows) else rows.take(keep)
+        return [row for row in rows if self.key_of(row) not in self._keys]
+
+
+class EntityCoverage:
+    """
+    Presence of the rows of each entity over the expected time buckets of a
+    table, as one bitmap per entity (bit i set: the entity has rows in bucket
+    i). Only the missing (entity, bucket) cells have to be generated.
+    """
+
+    def __init__(self, buckets: List[datetime], entity_ids: array):
+        self.buckets = buckets
+        self.entity_ids = entity_ids
+        self._index = {entity_id: idx for idx, entity_id in enumerate(entity_ids)}
+        self._bitmaps = [bytearray((len(buckets) + 7) // 8) for _ in entity_ids]
+        self._present = [0] * len(buckets)
+
+    def mark(self, entity_id: int, bucket_idx: int):
+        """Record that an entity has rows in a bucket."""
+        idx = self._index.get(entity_id)
+        if idx is None:
+            return
+        bitmap = self._bitmaps[idx]
+        byte, bit = divmod(bucket_idx, 8)
+        if not bitmap[byte] & (1 << bit):
+            bitmap[byte] |= 1 << bit
+            self._present[bucket_idx] += 1
+
+    def bitmap(self, entity_id: int) -> bytes:
+        return bytes(self._bitmaps[self._index[entity_id]])
+
+    def is_complete(self, bucket_idx: int) -> bool:
+        return self._present[bucket_idx] == len(self.entity_ids)
+
+    def missing_cells(self) -> int:
+        return len(self.entity_ids) * len(self.buckets) - sum(self._present)
+
+    def incomplete_buckets(self) -> List[datetime]:
+        return [
+            bucket
+            for idx, bucket in enumerate(self.buckets)
+            if not self.is_complete(idx)
+        ]
+
+    def missing_entities(self, bucket_idx: int) -> array:
+        """IDs of the entities without rows in a bucket."""
+        byte, bit = divmod(bucket_idx, 8)
+        mask = 1 << bit
+        return array(
+            "q",
+            (
+                entity_id
+                for entity_id, bitmap in zip(self.entity_ids, self._bitmaps)
+                if not bitmap[byte] & mask
+            ),
+        )
+
+
+class SourceDayCache:
+    """
+    LRU cache of fetched real-data source days, keyed by (table, source_date)
+    and bounded by an estimated memory budget. Evicted days are pickled to
+    spill_dir when given, one chunk after the other, and read back chunk by
+    chunk so a spilled day is never loaded whole.
+    """
+
+    def __init__(self, max_bytes: int, spill_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.hits = 0
+        self.misses = 0
+        self._days: "OrderedDict[Tuple[str, datetime], Tuple[List[RowBatch], int]]"
+        self._days = OrderedDict()
+        self._spilled: Dict[Tuple[str, datetime], str] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate_size(batch: RowBatch) -> int:
+        """Rough in-memory size of a batch of tuples."""
+        return len(batch) * (len(batch.columns) + 2) * SOURCE_CACHE_VALUE_BYTES
+
+    def get(self, key: Tuple[str, datetime]) -> Optional[Iterator[RowBatch]]:
+        """Chunks of a cached day, or None when the day is not cached."""
+        with self._lock:
+            if key in self._days:
+                self._days.move_to_end(key)
+                self.hits += 1
+                return iter(self._days[key][0])
+            path = self._spilled.get(key)
+            if path is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        return self._read_spilled(path)
+
+    @staticmethod
+    def _read_spilled(path: str) -> Iterator[RowBatch]:
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+
+    def put(self, key: Tuple[str, datetime], chunks: List[RowBatch], size: int):
+        if size > self.max_bytes:
+            return
+
+        evicted = []
+        with self._lock:
+            self._days[key] = (chunks, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                old_key, (old_chunks, old_size) = self._days.popitem(last=False)
+                self._size -= old_size
+                evicted.append((old_key, old_chunks))
+
+        for old_key, old_chunks in evicted:
+            self._spill(old_key, old_chunks)
+
+    def _spill(self, key: Tuple[str, datetime], chunks: List[RowBatch]):
+        if not self.spill_dir or key in self._spilled:
+            return
+
+        table, source_date = key
+        path = os.path.join(
+            self.spill_dir,
+            f"{table}.{source_date:%Y%m%d}.{os.getpid()}.pickle",
+        )
+        try:
+            with open(path, "wb") as f:
+                for chunk in chunks:
+                    pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+            with self._lock:
+                self._spilled[key] = path
+        except OSError as e:
+            logger.warning(f"[{table}] Cannot spill source day {source_date}: {e}")
+
+
+_SOURCE_DAY_CACHE: Optional[SourceDayCache] = None
+
+
+def get_source_day_cache(cfg: Config) -> Optional[SourceDayCache]:
+    """Source day cache of the current process, shared by its work units."""
+    global _SOURCE_DAY_CACHE
+
+    if not cfg.source_cache_mb:
+        return None
+    if _SOURCE_DAY_CACHE is None:
+        _SOURCE_DAY_CACHE = SourceDayCache(
+            cfg.source_cache_mb * 1024 * 1024, cfg.source_cache_dir
+        )
+    return _SOURCE_DAY_CACHE
+
+
 class DataProcessor:
     """Class for data processing."""
 
@@ -602,15 +1745,16 @@ class DataProcessor:
         connection_manager: ConnectionManager,
         analyzer: TableAnalyzer,
         config: Config,
+        dimensions: Optional[DimensionSnapshot] = None,
     ):
         self.conn_mgr = connection_manager
         self.analyzer = analyzer
         self.config = config
         self.metric_name = config.metric_name
-
-        ##(Optionnal) To fill some tables
-        self.fill_hostname_for_service()
-        self.fill_hostname_for_host()
+        self.dimensions = dimensions or DimensionSnapshot(
+            config.metric_name, config.liveservice_name
+        )
+        self.source_cache = get_source_day_cache(config)
 
     def debug_dates_comparison(self, table: str):
         """Debug function to compare expected vs existing dates"""
@@ -645,14 +1789,104 @@ class DataProcessor:
             logger.info(f"[{table}] DEBUG - Last missing dates: {missing_dates[-5:]}")
 
     def fetch_existing_dates(self, table: str, granularity: str) -> Set[datetime]:
-        """Fetch existing dates in the table optimally."""
+        """Fetch existing dates in the table, using the configured coverage mode."""
+        mode = self.config.coverage_mode
+
+        with METRICS.timed(table, "existing_dates") as metrics:
+            if mode == "scan":
+                existing_dates = self._scan_existing_dates(table, granularity)
+            else:
+                expected_dates = generate_expected_dates(granularity)
+                if mode == "partitions" and granularity == "day":
+                    existing_dates = self._partition_existing_dates(
+                        table, expected_dates
+                    )
+                else:
+                    existing_dates = self._probe_existing_dates(
+                        table, granularity, expected_dates
+                    )
+            metrics["rows"] = len(existing_dates)
+
+        return existing_dates
+
+    def _probe_existing_dates(
+        self, table: str, granularity: str, dates: List[datetime]
+    ) -> Set[datetime]:
+        """
+        Ask, bucket by bucket, whether at least one row exists. Each probe is a
+        LIMIT 1 range seek on the date column instead of a full window scan.
+        """
         schema = self.analyzer.get_table_schema(table)
         date_col = schema["primary_date_column"]
 
-        if not date_col:
+        if not date_col or not dates:
             return set()
 
-        with self.conn_mgr.get_connection() as conn:
+        start = time.time()
+        existing_dates = set()
+        query = (
+            f"SELECT 1 FROM `{table}` "
+            f"WHERE `{date_col}` >= %s AND `{date_col}` < %s LIMIT 1"
+        )
+
+        with self.conn_mgr.get_connection() as conn:
+            cursor = conn.cursor(buffered=True)
+
+            try:
+                for date in dates:
+                    cursor.execute(query, bucket_bounds(date, granularity))
+                    if cursor.fetchone() is not None:
+                        existing_dates.add(date)
+            except mysql.connector.Error as e:
+                logger.error(f"[{table}] Error probing existing dates: {e}")
+                return set()
+
+        METRICS.add(table, "existing_dates", statements=len(dates))
+        logger.info(
+            f"[{table}] Probed {len(dates)} {granularity} buckets in "
+            f"{time.time() - start:.2f}s: {len(existing_dates)} existing"
+        )
+        return existing_dates
+
+    def _partition_existing_dates(
+        self, table: str, dates: List[datetime]
+    ) -> Set[datetime]:
+        """
+        Read daily coverage from INFORMATION_SCHEMA.PARTITIONS.TABLE_ROWS. Days
+        not matching exactly one daily partition are probed instead.
+        """
+        row_counts = self.analyzer.get_partition_row_counts(table)
+        bounds = sorted(row_counts)
+        lower_bounds = dict(zip(bounds[1:], bounds[:-1]))
+        existing_dates = set()
+        to_probe = []
+
+        for date in dates:
+            start_ts, end_ts = bucket_bounds(date, "day")
+            if lower_bounds.get(end_ts) == start_ts:
+                if row_counts[end_ts] > 0:
+                    existing_dates.add(date)
+            else:
+                to_probe.append(date)
+
+        if to_probe:
+            existing_dates |= self._probe_existing_dates(table, "day", to_probe)
+
+        logger.info(
+            f"[{table}] Partition coverage: {len(existing_dates)} existing days "
+            f"({len(to_probe)} probed)"
+        )
+        return existing_dates
+
+    def _scan_existing_dates(self, table: str, granularity: str) -> Set[datetime]:
+        """Fetch existing dates with a DISTINCT scan over the whole window."""
+        schema = self.analyzer.get_table_schema(table)
+        date_col = schema["primary_date_column"]
+
+        if not date_col:
+            return set()
+
+        with self.conn_mgr.get_connection() as conn:
             cursor = conn.cursor(dictionary=True)
 
             try:
@@ -770,286 +2004,378 @@ class DataProcessor:
                 logger.error(f"[{table}] Error fetching existing dates: {e}")
                 return set()
 
-    def change_date_into_row(
-        self, table: str, target_date: datetime, source_date: datetime
-    ) -> List[Dict]:
-        """Fetch and transform source data."""
+    def analyze_entity_coverage(
+        self, table: str, granularity: str, buckets: List[datetime]
+    ) -> Optional[EntityCoverage]:
+        """
+        Compute which (entity, bucket) cells of a table hold rows, with one
+        grouped scan of the window checked against the dimension IDs. Returns
+        None for tables without entity configuration.
+        """
         config = get_table_config(table)
-        schema = self.analyzer.get_table_schema(table)
-        date_col = schema["primary_date_column"]
+        date_col = self.analyzer.get_table_schema(table)["primary_date_column"]
 
-        if not date_col:
-            return []
+        if not config.entity_column or not date_col or not buckets:
+            return None
+
+        buckets = sorted(buckets)
+        start = time.perf_counter()
+        entity_ids = self.dimensions.load(self.conn_mgr).ids(config.entity_dimension)
+        coverage = EntityCoverage(buckets, entity_ids)
+        if not entity_ids:
+            return coverage
+
+        starts = [bucket_bounds(bucket, granularity)[0] for bucket in buckets]
+        window_start = starts[0]
+        window_end = bucket_bounds(buckets[-1], granularity)[1]
+
+        # Fixed-size buckets are numbered by the server, months in Python
+        if granularity == "month":
+            bucket_sql = f"`{date_col}`"
+            params = (window_start, window_end)
+        else:
+            bucket_sql = f"(`{date_col}` - %s) DIV %s"
+            step = 3600 if granularity == "hour" else 86400
+            params = (window_start, step, window_start, window_end)
+        query = (
+            f"SELECT `{config.entity_column}`, {bucket_sql} FROM `{table}` "
+            f"WHERE `{date_col}` >= %s AND `{date_col}` < %s "
+            f"GROUP BY 1, 2"
+        )
 
         with self.conn_mgr.get_connection() as conn:
-            cursor = conn.cursor(dictionary=True)
+            cursor = conn.cursor()
 
             try:
-                # Generate fake data
-                if self.config.use_fake_data:
-                    source_rows = self._generate_fake_rows_by_date(table, source_date)
-
-                # Fetch real data
-                else:
-                    source_rows = self._fetch_rows_by_date(
-                        cursor, table, date_col, source_date, config.fetch_limit
-                    )
-
-                if not source_rows:
-                    return []
-
-                # Transform data
-                transformed_rows = []
-                for row in source_rows:
-                    new_row = self._transform_row(row, schema, target_date)
-
-                    if new_row and not self._row_exists(cursor, table, new_row, schema):
-                        transformed_rows.append(new_row)
-
-                return transformed_rows
+                cursor.execute(query, params)
+                positions = {ts: idx for idx, ts in enumerate(starts)}
+                while True:
+                    cells = cursor.fetchmany(10000)
+                    if not cells:
+                        break
+                    METRICS.add(table, "entity_coverage", rows=len(cells))
+                    for entity_id, bucket in cells:
+                        if granularity == "month":
+                            idx = bisect.bisect_right(starts, bucket) - 1
+                        else:
+                            idx = positions.get(window_start + int(bucket) * step)
+                        if idx is not None and idx >= 0:
+                            coverage.mark(entity_id, idx)
 
             except mysql.connector.Error as e:
-                logger.error(
-                    f"[{table}] Error fetching source data for {source_date}: {e}"
-                )
-                return []
-
-    def _fetch_rows_by_date(
-        self, cursor, table: str, date_col: str, target_date: datetime, limit: int
-    ) -> List[Dict]:
-        """Fetch rows for a given date."""
-
-        try:
-            utc = pytz.UTC
-            local_tz = pytz.timezone("UTC")
-
-            if is_monthly_table(table):
-                local_start = local_tz.localize(
-                    datetime(target_date.year, target_date.month, 1)
-                )
-                start_ts = int(local_start.astimezone(utc).timestamp())
-                query = f"SELECT * FROM `{table}` WHERE {date_col} = %s LIMIT %s"
-                cursor.execute(query, (start_ts, limit))
-
-            else:
-                local_start = local_tz.localize(
-                    datetime(
-                        target_date.year, target_date.month, target_date.day, 0, 0, 0
-                    )
-                )
-                local_end = local_tz.localize(
-                    datetime(
-                        target_date.year, target_date.month, target_date.day, 23, 59, 59
-                    )
-                )
-                start_ts = int(local_start.astimezone(utc).timestamp())
-                end_ts = int(local_end.astimezone(utc).timestamp())
-                query = f"SELECT * FROM `{table}` WHERE {date_col} BETWEEN %s AND %s LIMIT %s"
-                cursor.execute(query, (start_ts, end_ts, limit))
-
-            rows = cursor.fetchall()
-            if len(rows) == limit:
-                logger.warning(
-                    f"[{table}] Limit of {limit} rows reached / {target_date}"
-                )
-
-            return rows
-
-        except mysql.connector.Error as e:
-            logger.error(f"[{table}] Error fetching rows for {target_date}: {e}")
-            return []
+                logger.error(f"[{table}] Error analyzing entity coverage: {e}")
+                return None
 
-    def _fetch_servicemetrics_ids(self, metric_name: str) -> List[Dict]:
-        """
-        Fetch servicemetric_id from mod_bi_servicemetrics
-        filtered by a specific metric_name.
+        METRICS.add(
+            table,
+            "entity_coverage",
+            calls=1,
+            seconds=time.perf_counter() - start,
+            statements=1,
+        )
+        logger.info(
+            f"[{table}] Entity coverage in {time.perf_counter() - start:.2f}s: "
+            f"{len(entity_ids)} entities, {coverage.missing_cells()} missing "
+            f"cells over {len(coverage.incomplete_buckets())} incomplete buckets"
+        )
+        return coverage
+
+    def _keep_entities(self, rows, column: str, entity_ids: Set[int]):
+        """Keep the rows of the given entities."""
+        if isinstance(rows, Batch):
+            if not rows.has_column(column):
+                return rows
+            keep = [
+                idx
+                for idx, (entity_id,) in enumerate(rows.iter_rows([column]))
+                if entity_id in entity_ids
+            ]
+            return rows if len(keep) == len(rows) else rows.take(keep)
+        return [row for row in rows if row.get(column) in entity_ids]
+
+    def iter_changed_rows(
+        self,
+        table: str,
+        target_date: datetime,
+        source_date: datetime,
+        entity_ids: Optional[array] = None,
+    ) -> Iterator:
         """
-        ids = []
-
-        query = """
-            SELECT id
-            FROM mod_bi_servicemetrics
-            WHERE metric_name = %s
-            # AND host_name LIKE "host_name_1%"
-            # AND service_description = "service_name_677"
-            # LIMIT 1000
+        Fetch and transform source data, moved from source_date to target_date
+        and without the rows already stored. Real data is streamed and yielded
+        chunk by chunk; generated data is yielded at once (a Batch, or a list
+        of dicts with the per-row Python generator). With entity_ids, only the
+        rows of those entities are kept.
         """
+        config = get_table_config(table)
+        schema = self.analyzer.get_table_schema(table)
+        date_col = schema["primary_date_column"]
 
-        try:
-            with self.conn_mgr.get_connection() as conn:
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute(query, (metric_name,))
-                rows = cursor.fetchall()
-                ids = [row["id"] for row in rows]
-        except Exception as e:
-            logger.error(
-                f"Failed to fetch servicemetric IDs for metric '{metric_name}': {e}"
-            )
+        if not date_col:
+            return
+        if entity_ids is not None and not entity_ids:
+            return
 
-        return ids
+        entity_filter = None
+        if entity_ids is not None and config.entity_column:
+            entity_filter = set(entity_ids)
 
-    def _fetch_liveservice_id(self, liveservice_name: str) -> Optional[int]:
-        """
-        Fetch id from mod_bi_liveservice
-        filtered by a specific liveservice_name.
-        """
+        # Generate fake data, columnar (only for the requested entities)
+        if self.config.use_fake_data and self.config.generator == "numpy":
+            with METRICS.timed(table, "generate") as metrics:
+                batch = self._generate_fake_columns_by_date(
+                    table, source_date, entity_ids
+                )
+                metrics["rows"] = len(batch) if batch is not None else 0
+            source = [batch] if batch is not None else []
+            entity_filter = None
 
-        query = """
-            SELECT id
-            FROM mod_bi_liveservice
-            WHERE name = %s
-            LIMIT 1
-        """
+        # Generate fake data
+        elif self.config.use_fake_data:
+            with METRICS.timed(table, "generate") as metrics:
+                source = [self._generate_fake_rows_by_date(table, source_date)]
+                metrics["rows"] = len(source[0] or [])
 
-        try:
-            with self.conn_mgr.get_connection() as conn:
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute(query, (liveservice_name,))
-                row = cursor.fetchone()
-                return row["id"] if row else None
-        except Exception as e:
-            logger.error(
-                f"Failed to fetch id for liveservice '{liveservice_name}': {e}"
+        # Fetch real data
+        else:
+            source = self._iter_source_rows(
+                table, date_col, source_date, config.fetch_chunk_size
             )
-            return None
-
-    def _fetch_ba_ids(self) -> List[int]:
-        """
-        Fetch all ba_id from mod_bam_reporting_ba.
-        """
-        ids = []
-
-        query = """
-            SELECT ba_id
-            FROM mod_bam_reporting_ba
-            WHERE ba_id IS NOT NULL
-        """
 
+        # The existing keys are loaded while the source stream holds its
+        # connection: the producer uses up to two pooled connections
         try:
-            with self.conn_mgr.get_connection() as conn:
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute(query)
-                rows = cursor.fetchall()
-                ids = [row["ba_id"] for row in rows]
-        except Exception as e:
-            logger.error(f"Failed to fetch ba_ids from mod_bam_reporting_ba: {e}")
-
-        return ids
+            existing = None
+            keys_loaded = False
+            for rows in source:
+                if not rows:
+                    continue
 
-    def _fetch_host_ids(self) -> List[int]:
-        """
-        Fetch all modbihost_id from mod_bi_host.
-        """
-        ids = []
+                # Transform data
+                with METRICS.timed(table, "transform", rows=len(rows)):
+                    if isinstance(rows, Batch):
+                        rows = self._transform_batch(rows, schema, target_date)
+                    else:
+                        rows = [
+                            new_row
+                            for new_row in (
+                                self._transform_row(row, schema, target_date)
+                                for row in rows
+                            )
+                            if new_row
+                        ]
+                if not len(rows):
+                    continue
 
-        query = """
-            SELECT id
-            FROM mod_bi_hosts
-            WHERE id IS NOT NULL
-        """
+                if entity_filter is not None:
+                    rows = self._keep_entities(
+                        rows, config.entity_column, entity_filter
+                    )
+                    if not len(rows):
+                        continue
+
+                # Dates are all moved to target_date: one key scan per date
+                if not keys_loaded:
+                    with METRICS.timed(table, "existing_keys"):
+                        existing = self._load_existing_keys(
+                            target_table(self.config, table), rows, schema
+                        )
+                    keys_loaded = True
 
-        try:
-            with self.conn_mgr.get_connection() as conn:
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute(query)
-                rows = cursor.fetchall()
-                ids = [row["id"] for row in rows]
-        except Exception as e:
-            logger.error(f"Failed to fetch modbihost_ids from mod_bi_host: {e}")
+                with METRICS.timed(table, "filter_existing") as metrics:
+                    rows = self._filter_existing_rows(table, rows, existing)
+                    metrics["rows"] = len(rows)
+                if len(rows):
+                    yield rows
 
-        return ids
+        except mysql.connector.Error as e:
+            logger.error(f"[{table}] Error fetching source data for {source_date}: {e}")
+            raise
 
-    def _fetch_services_ids(self) -> List[int]:
+    def _iter_source_rows(
+        self, table: str, date_col: str, source_date: datetime, chunk_size: int
+    ) -> Iterator[RowBatch]:
         """
-        Fetch all modbiservice_id from mod_bi_service.
+        Rows of a source day, from the source day cache when it was already
+        fetched, otherwise streamed from the database and kept in the cache
+        when the whole day fits in its budget.
         """
-        ids = []
+        if self.source_cache is None:
+            yield from self._iter_rows_by_date(table, date_col, source_date, chunk_size)
+            return
 
-        query = """
-            SELECT id
-            FROM mod_bi_services
-            WHERE id IS NOT NULL
-        """
+        key = (table, source_date)
+        cached = self.source_cache.get(key)
+        if cached is not None:
+            METRICS.add(table, "source_cache", hits=1)
+            yield from cached
+            return
+        METRICS.add(table, "source_cache", misses=1)
+
+        # A fetch error propagates before the day is cached
+        chunks = []
+        size = 0
+        for batch in self._iter_rows_by_date(table, date_col, source_date, chunk_size):
+            if chunks is not None:
+                chunks.append(batch)
+                size += SourceDayCache.estimate_size(batch)
+                if size > self.source_cache.max_bytes:
+                    chunks = None
+            yield batch
+
+        if chunks is not None:
+            self.source_cache.put(key, chunks, size)
+
+    def _source_day_condition(
+        self, table: str, date_col: str, source_date: datetime, alias: str = ""
+    ) -> Tuple[str, Tuple]:
+        """WHERE condition (and its parameters) selecting the rows of a source day."""
+        utc = pytz.UTC
+        local_tz = pytz.timezone("UTC")
+        column = f"{alias}.`{date_col}`" if alias else date_col
 
-        try:
-            with self.conn_mgr.get_connection() as conn:
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute(query)
-                rows = cursor.fetchall()
-                ids = [row["id"] for row in rows]
-        except Exception as e:
-            logger.error(f"Failed to fetch modbiservice_ids from mod_bi_services: {e}")
+        if is_monthly_table(table):
+            local_start = local_tz.localize(
+                datetime(source_date.year, source_date.month, 1)
+            )
+            start_ts = int(local_start.astimezone(utc).timestamp())
+            return f"{column} = %s", (start_ts,)
 
-        return ids
+        local_start = local_tz.localize(
+            datetime(source_date.year, source_date.month, source_date.day, 0, 0, 0)
+        )
+        local_end = local_tz.localize(
+            datetime(source_date.year, source_date.month, source_date.day, 23, 59, 59)
+        )
+        start_ts = int(local_start.astimezone(utc).timestamp())
+        end_ts = int(local_end.astimezone(utc).timestamp())
+        return f"{column} BETWEEN %s AND %s", (start_ts, end_ts)
 
-    def _fetch_hostgroups_ids(self) -> List[int]:
+    def _iter_rows_by_date(
+        self, table: str, date_col: str, target_date: datetime, chunk_size: int
+    ) -> Iterator[RowBatch]:
         """
-        Fetch all modbiservice_id from mod_bi_service.
+        Stream the rows of a given date in chunks of tuples, through an
+        unbuffered cursor, so memory stays flat whatever the day size. A fetch
+        error (e.g. the server dropping an idle stream after net_write_timeout)
+        is raised: the date must not be taken for complete.
         """
-        ids = []
+        condition, params = self._source_day_condition(table, date_col, target_date)
+        query = f"SELECT * FROM `{table}` WHERE {condition}"
 
-        query = """
-            SELECT id
-            FROM mod_bi_hostgroups
-            WHERE id IS NOT NULL
-        """
+        with self.conn_mgr.get_connection() as conn:
+            cursor = conn.cursor(buffered=False)
 
-        try:
-            with self.conn_mgr.get_connection() as conn:
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute(query)
-                rows = cursor.fetchall()
-                ids = [row["id"] for row in rows]
-        except Exception as e:
-            logger.error(f"Failed to fetch modbiservice_ids from mod_bi_services: {e}")
+            try:
+                start = time.perf_counter()
+                cursor.execute(query, params)
+                METRICS.add(
+                    table,
+                    "fetch_source",
+                    calls=1,
+                    statements=1,
+                    seconds=time.perf_counter() - start,
+                )
+                while True:
+                    start = time.perf_counter()
+                    rows = cursor.fetchmany(chunk_size)
+                    METRICS.add(
+                        table,
+                        "fetch_source",
+                        rows=len(rows),
+                        seconds=time.perf_counter() - start,
+                    )
+                    if not rows:
+                        break
+                    yield RowBatch(cursor.column_names, rows)
+
+            except mysql.connector.Error as e:
+                logger.error(f"[{table}] Error fetching rows for {target_date}: {e}")
+                raise
 
-        return ids
+            finally:
+                # Stopped before the end: drop the rest of the result set
+                try:
+                    if conn.unread_result:
+                        conn.consume_results()
+                except mysql.connector.Error:
+                    pass
 
-    def _fetch_hostcategories_ids(self) -> List[int]:
-        """
-        Fetch all modbiservice_id from mod_bi_service.
+    def server_copy_query(
+        self,
+        table: str,
+        target_date: datetime,
+        source_date: datetime,
+        entity_gaps: bool = False,
+    ) -> Optional[Tuple[List[str], str, Tuple, int]]:
         """
-        ids = []
-
-        query = """
-            SELECT id
-            FROM mod_bi_hostcategories
-            WHERE id IS NOT NULL
+        Express iter_changed_rows as a SELECT run by the server: the source
+        day is read, auto-increment dropped, dates moved to target_date and
+        rows already stored excluded with an anti-join, so no row data goes
+        through Python. With entity_gaps, the entities having rows on the
+        target date are excluded as well. Returns (columns, select_sql,
+        params, target_ts), or None when the table must be processed locally.
         """
+        config = get_table_config(table)
+        schema = self.analyzer.get_table_schema(table)
+        date_col = schema["primary_date_column"]
 
-        try:
-            with self.conn_mgr.get_connection() as conn:
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute(query)
-                rows = cursor.fetchall()
-                ids = [row["id"] for row in rows]
-        except Exception as e:
-            logger.error(f"Failed to fetch modbiservice_ids from mod_bi_services: {e}")
-
-        return ids
+        if not config.server_copy or not date_col or not schema["columns"]:
+            return None
 
-    def _fetch_servicecategories_ids(self) -> List[int]:
-        """
-        Fetch all modbiservice_id from mod_bi_service.
-        """
-        ids = []
+        target_ts = self.normalize_unix_to_day(int(target_date.timestamp()))
+        auto_increment = set(schema.get("auto_increment", []))
+        columns = [col for col in schema["columns"] if col not in auto_increment]
+
+        def expression(col: str) -> Tuple[str, Tuple]:
+            # Same as _transform_row: non NULL dates become target_ts
+            if col in schema["date_columns"]:
+                return f"IF(s.`{col}` IS NULL, NULL, %s)", (target_ts,)
+            return f"s.`{col}`", ()
+
+        select_exprs = []
+        params = []
+        for col in columns:
+            expr, expr_params = expression(col)
+            select_exprs.append(expr)
+            params.extend(expr_params)
+
+        condition, condition_params = self._source_day_condition(
+            table, date_col, source_date, alias="s"
+        )
+        params.extend(condition_params)
+        query = (
+            f"SELECT {', '.join(select_exprs)} FROM `{table}` AS s WHERE {condition}"
+        )
 
-        query = """
-            SELECT id
-            FROM mod_bi_servicecategories
-            WHERE id IS NOT NULL
-        """
+        # Same as _filter_existing_rows, with the stored keys of the target day
+        # Stored rows are looked up in the table receiving the copy
+        target = target_table(self.config, table)
+        key_cols = self._unique_key_columns(table, columns)
+        if key_cols and not self.analyzer.has_unique_index_within(table, key_cols):
+            matches = [f"e.`{date_col}` = %s"]
+            params.append(target_ts)
+            for col in key_cols:
+                expr, expr_params = expression(col)
+                matches.append(f"e.`{col}` <=> {expr}")
+                params.extend(expr_params)
+            query += (
+                f" AND NOT EXISTS (SELECT 1 FROM `{target}` AS e "
+                f"WHERE {' AND '.join(matches)})"
+            )
 
-        try:
-            with self.conn_mgr.get_connection() as conn:
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute(query)
-                rows = cursor.fetchall()
-                ids = [row["id"] for row in rows]
-        except Exception as e:
-            logger.error(f"Failed to fetch modbiservice_ids from mod_bi_services: {e}")
+        if entity_gaps and config.entity_column:
+            bucket_start, bucket_end = bucket_bounds(
+                target_date, table_granularity(table)
+            )
+            query += (
+                f" AND NOT EXISTS (SELECT 1 FROM `{target}` AS g "
+                f"WHERE g.`{config.entity_column}` = s.`{config.entity_column}` "
+                f"AND g.`{date_col}` >= %s AND g.`{date_col}` < %s)"
+            )
+            params.extend((bucket_start, bucket_end))
 
-        return ids
+        return columns, query, tuple(params), target_ts
 
     def _generate_metric_values(self) -> Dict[str, float]:
         """Generate consistent metric values."""
@@ -1278,17 +2604,15 @@ class DataProcessor:
         fake_rows = []
         table = table.lower()
 
-        l_ids_metrics = []
-        l_ids_bas = []
-        metric_name = self.config.metric_name
-        liveservice_id = self._fetch_liveservice_id(self.config.liveservice_name)
-        l_ids_metrics = self._fetch_servicemetrics_ids(metric_name)
-        l_ids_bas = self._fetch_ba_ids()
-        l_ids_hosts = self._fetch_host_ids()
-        l_ids_services = self._fetch_services_ids()
-        l_ids_hg = self._fetch_hostgroups_ids()
-        l_ids_hc = self._fetch_hostcategories_ids()
-        l_ids_sc = self._fetch_servicecategories_ids()
+        dimensions = self.dimensions.load(self.conn_mgr)
+        liveservice_id = dimensions.liveservice_id
+        l_ids_metrics = dimensions.ids("servicemetrics")
+        l_ids_bas = dimensions.ids("bas")
+        l_ids_hosts = dimensions.ids("hosts")
+        l_ids_services = dimensions.ids("services")
+        l_ids_hg = dimensions.ids("hostgroups")
+        l_ids_hc = dimensions.ids("hostcategories")
+        l_ids_sc = dimensions.ids("servicecategories")
 
         ##### Monthly
         if is_monthly_table(table):
@@ -1384,6 +2708,281 @@ class DataProcessor:
 
         return fake_rows
 
+    def _metric_value_columns(self, size: int) -> Dict[str, Any]:
+        """Vectorized _generate_metric_values, plus the total column."""
+        rng = self._rng
+        min_val = np.round(rng.uniform(0.01, 10, size), 6)
+        max_val = np.round(rng.uniform(50, 150, size), 6)
+        first_val = np.round(min_val + (max_val - min_val) * rng.random(size), 6)
+        last_val = np.round(min_val + (max_val - min_val) * rng.random(size), 6)
+        avg_val = np.round((min_val + max_val + first_val + last_val) / 4, 7)
+
+        return {
+            "avg_value": avg_val,
+            "min_value": min_val,
+            "max_value": max_val,
+            "first_value": first_val,
+            "last_value": last_val,
+            "total": np.round(rng.uniform(90, 150, size), 6),
+        }
+
+    def _centile_value_columns(self, size: int) -> Dict[str, Any]:
+        """Vectorized _generate_centile_values, plus the total column."""
+        rng = self._rng
+        min_val = rng.uniform(0.01, 10, size)
+        max_val = rng.uniform(50, 150, size)
+        centile_value = np.round(min_val + (max_val - min_val) * rng.random(size), 6)
+
+        return {
+            "centile_value": centile_value,
+            "centile_param": 99.0000,
+            "centile_id": 1,
+            "total": np.round(rng.uniform(90, 150, size), 6),
+        }
+
+    def _randint_columns(self, size: int, ranges: Dict[str, Tuple[int, int]]):
+        """Random integer columns, bounds included like random.randint."""
+        return {
+            col: self._rng.integers(low, high + 1, size)
+            for col, (low, high) in ranges.items()
+        }
+
+    def _generate_fake_columns_by_date(
+        self, table: str, target_date: datetime, entity_ids: Optional[array] = None
+    ) -> Optional[ColumnBatch]:
+        """
+        Columnar counterpart of _generate_fake_rows_by_date: generate the rows
+        of every entity for a date at once, as one NumPy array per column,
+        with the same value ranges as the per-row generators. entity_ids
+        restricts the entities of the table entity dimension.
+        """
+        entity_dimension = get_table_config(table).entity_dimension
+        table = table.lower()
+        if not hasattr(self, "_rng"):
+            self._rng = np.random.default_rng()
+
+        dimensions = self.dimensions.load(self.conn_mgr)
+        liveservice_id = dimensions.liveservice_id
+
+        def ids_of(dimension: str):
+            if entity_ids is not None and dimension == entity_dimension:
+                return np.frombuffer(entity_ids, dtype=np.int64)
+            return np.frombuffer(dimensions.ids(dimension), dtype=np.int64)
+
+        def batch(ids_columns: Dict[str, Any], **columns) -> ColumnBatch:
+            result = ColumnBatch(list(ids_columns), list(ids_columns.values()))
+            for col, values in columns.items():
+                result.set_column(col, values)
+            return result
+
+        ##### Monthly
+        if is_monthly_table(table):
+            time_id = bucket_bounds(target_date, "month")[0]
+
+            if "metric" in table:
+                ids = ids_of("servicemetrics")
+                if "centile" in table:
+                    values = self._centile_value_columns(len(ids))
+                else:
+                    values = self._metric_value_columns(len(ids))
+                return batch(
+                    {"servicemetric_id": ids},
+                    time_id=time_id,
+                    liveservice_id=liveservice_id,
+                    **values,
+                    warning_treshold=200.0,
+                    critical_treshold=400.0,
+                )
+
+            if "monthavailability" in table:
+                grid = np.array(
+                    np.meshgrid(
+                        ids_of("hostgroups"),
+                        ids_of("hostcategories"),
+                        ids_of("servicecategories"),
+                        indexing="ij",
+                    )
+                ).reshape(3, -1)
+                ids_columns = {"modbihg_id": grid[0], "modbihc_id": grid[1]}
+                common = {
+                    "mtrs": 2,
+                    "mtbsi": 4,
+                    "mtbf": 2,
+                    "available": 60000,
+                    "unavailable_time": 0,
+                }
+                if "hgmonthavailability" in table:
+                    return batch(
+                        ids_columns,
+                        time_id=time_id,
+                        liveservice_id=liveservice_id,
+                        **common,
+                        actual_unavailable_total=0,
+                        alert_unavailable_opened=0,
+                        alert_unavailable_closed=0,
+                        alert_unreachable_opened=0,
+                        alert_unreachable_closed=0,
+                        alert_unreachable_duration=0,
+                    )
+                return batch(
+                    {**ids_columns, "modbisc_id": grid[2]},
+                    time_id=time_id,
+                    liveservice_id=liveservice_id,
+                    **common,
+                    degraded_time=0,
+                    desr_unavailable_total=0,
+                    alert_unavailable_opened=0,
+                    alert_unavailable_closed=0,
+                    alert_degraded_total=0,
+                    alert_degraded_opened=0,
+                    alert_degraded_closed=0,
+                    alert_other_total=0,
+                    alert_other_opened=0,
+                    alert_other_closed=0,
+                )
+
+            return None
+
+        ##### Hourly
+        if is_hourly_table(table):
+            time_id = bucket_bounds(target_date, "hour")[0]
+
+            if "metric" in table and "centile" not in table:
+                ids = ids_of("servicemetrics")
+                return batch(
+                    {"servicemetric_id": ids},
+                    time_id=time_id,
+                    liveservice_id=liveservice_id,
+                    **self._metric_value_columns(len(ids)),
+                    warning_treshold=50.0,
+                    critical_treshold=100.0,
+                )
+            return None
+
+        ##### Daily
+        time_id = bucket_bounds(target_date, "day")[0]
+
+        if "hostavailability" in table:
+            ids = ids_of("hosts")
+            return batch(
+                {"modbihost_id": ids},
+                time_id=time_id,
+                liveservice_id=liveservice_id,
+                **self._randint_columns(
+                    len(ids),
+                    {
+                        "available": (30000, 60000),
+                        "unavailable": (10000, 50000),
+                        "unreachable": (5000, 20000),
+                        "alert_unavailable_opened": (0, 200),
+                        "alert_unavailable_closed": (0, 200),
+                        "alert_unreachable_opened": (0, 200),
+                        "alert_unreachable_closed": (0, 200),
+                    },
+                ),
+            )
+
+        if "serviceavailability" in table:
+            ids = ids_of("services")
+            return batch(
+                {"modbiservice_id": ids},
+                time_id=time_id,
+                liveservice_id=liveservice_id,
+                **self._randint_columns(
+                    len(ids),
+                    {
+                        "available": (30000, 60000),
+                        "unavailable": (10000, 50000),
+                        "degraded": (0, 50),
+                        "alert_unavailable_opened": (0, 2),
+                        "alert_unavailable_closed": (0, 2),
+                        "alert_unreachable_opened": (0, 2),
+                        "alert_unreachable_closed": (0, 2),
+                    },
+                ),
+            )
+
+        if "stateevents" in table:
+            # Like the per-row generator, host state events use service IDs
+            ids = ids_of("services")
+            resource = "service" if "servicestateevents" in table else "host"
+            size = len(ids)
+            return batch(
+                {f"modbi{resource}_id": ids},
+                modbiliveservice_id=liveservice_id,
+                state=self._rng.integers(0, 4, size),
+                start_time=time_id,
+                end_time=time_id + self._rng.integers(60, 201, size),
+                **self._randint_columns(
+                    size,
+                    {
+                        "duration": (60, 600),
+                        "sla_duration": (75, 100),
+                        "ack_time": (0, 100),
+                    },
+                ),
+                last_update=1,
+            )
+
+        if "_ba_" in table and "ba_avail" in table:
+            ids = ids_of("bas")
+            return batch(
+                {"ba_id": ids},
+                time_id=time_id,
+                timeperiod_id=1,
+                **self._randint_columns(
+                    len(ids),
+                    {
+                        "available": (60000, 86400),
+                        "unavailable": (0, 10000),
+                        "degraded": (0, 5000),
+                        "unknown": (0, 500),
+                        "downtime": (0, 3000),
+                        "alert_unavailable_opened": (0, 3),
+                        "alert_degraded_opened": (0, 3),
+                        "alert_unknown_opened": (0, 3),
+                        "nb_downtime": (0, 2),
+                    },
+                ),
+                timeperiod_is_default=1,
+            )
+
+        if "metric" in table:
+            ids = ids_of("servicemetrics")
+            if "centile" in table:
+                values = self._centile_value_columns(len(ids))
+            else:
+                values = self._metric_value_columns(len(ids))
+            return batch(
+                {"servicemetric_id": ids},
+                time_id=time_id,
+                liveservice_id=liveservice_id,
+                **values,
+                warning_treshold=200.0,
+                critical_treshold=400.0,
+            )
+
+        return None
+
+    def _transform_batch(
+        self, batch: Batch, schema: Dict, target_date: datetime
+    ) -> Batch:
+        """Batch _transform_row: drop auto-increment, move dates to target."""
+        target_ts = self.normalize_unix_to_day(int(target_date.timestamp()))
+
+        if isinstance(batch, RowBatch):
+            return batch.transform(
+                set(schema.get("auto_increment", [])),
+                {col: target_ts for col in schema["date_columns"]},
+            )
+
+        batch.drop_columns(schema.get("auto_increment", []))
+        for col in schema["date_columns"]:
+            if batch.has_column(col):
+                batch.set_column(col, target_ts)
+
+        return batch
+
     def _transform_row(
         self, row: Dict, schema: Dict, target_date: datetime
     ) -> Optional[Dict]:
@@ -1413,136 +3012,165 @@ class DataProcessor:
 
         return new_row
 
-    def _row_exists(self, cursor, table: str, row: Dict, schema: Dict) -> bool:
-        """Check if a row already exists."""
+    def _unique_key_columns(self, table: str, row) -> List[str]:
+        """Columns identifying a row (or a list of columns), for duplicate detection."""
         config = get_table_config(table)
 
         if config.unique_key_strategy:
-            compare_cols = [col for col in config.unique_key_strategy if col in row]
-        else:
-            compare_cols = [
-                col for col in row.keys() if col not in TIME_COLUMNS_CANDIDATES
-            ][:3]
+            return [col for col in config.unique_key_strategy if col in row]
+        return [col for col in row if col not in TIME_COLUMNS_CANDIDATES][:3]
 
-        if not compare_cols:
-            return False
+    def _load_existing_keys(
+        self, table: str, rows, schema: Dict
+    ) -> Optional[ExistingKeys]:
+        """
+        Load the keys already stored in the table over the rows time window,
+        with one range scan. Returns None when no filtering is needed. The
+        schema lookups are done before taking the pooled connection.
+        """
+        sample = rows.columns if isinstance(rows, Batch) else rows[0]
+        key_cols = self._unique_key_columns(table, sample)
+        if not key_cols:
+            return None
+
+        # A unique index covering the key lets INSERT IGNORE do the filtering
+        if self.analyzer.has_unique_index_within(table, key_cols):
+            return None
+
+        date_col = schema["primary_date_column"]
+        date_values = column_values(rows, date_col)
 
         try:
-            where_clause = " AND ".join([f"`{col}` = %s" for col in compare_cols])
-            query = f"SELECT 1 FROM `{table}` WHERE {where_clause} LIMIT 1"
-            values = tuple(row[col] for col in compare_cols)
-            cursor.execute(query, values)
-            return cursor.fetchone() is not None
+            with self.conn_mgr.get_connection() as conn:
+                return ExistingKeys(key_cols).load(
+                    conn.cursor(),
+                    table,
+                    date_col,
+                    min(date_values) if date_values else None,
+                    max(date_values) if date_values else None,
+                )
         except mysql.connector.Error as e:
-            logger.debug(f"[{table}] Error checking existence: {e}")
-            return False
-
-    def get_host_by_id(self, host_id: int) -> Optional[Dict[str, Any]]:
-        """Fetch host_id and host_name from the 'host' table for a given host_id."""
-        with self.conn_mgr.get_connection() as conn:
-            cursor = conn.cursor(dictionary=True)
+            logger.debug(f"[{table}] Error loading existing keys: {e}")
+            return None
 
-            try:
-                query = """
-                    SELECT host_id, name
-                    FROM hosts
-                    WHERE host_id = %s
-                """
-                cursor.execute(query, (host_id,))
-                result = cursor.fetchone()
-                return result if result else None
+    def _filter_existing_rows(self, table: str, rows, existing: Optional[ExistingKeys]):
+        """Drop the rows whose key is already stored in the table."""
+        if existing is None:
+            return rows
 
-            except mysql.connector.Error as e:
-                logger.error(f"[host] Error fetching host by ID {host_id}: {e}")
-                return None
+        new_rows = existing.filter_new(rows)
+        logger.debug(
+            f"[{table}] {len(rows) - len(new_rows)} rows already exist "
+            f"({existing.count} keys scanned)"
+        )
+        return new_rows
+
+    def _update_hostnames_by_range(
+        self, cursor, update_query: str, min_id: int, max_id: int
+    ) -> int:
+        """Run a host_name UPDATE ... JOIN hosts chunk by chunk of host_id."""
+        updated_count = 0
+        for chunk_start in range(min_id, max_id + 1, HOSTNAME_SYNC_CHUNK):
+            cursor.execute(
+                update_query, (chunk_start, chunk_start + HOSTNAME_SYNC_CHUNK - 1)
+            )
+            updated_count += cursor.rowcount
+        return updated_count
 
-    def fill_hostname_for_service(self):
+    def fill_hostname_for_service(self) -> int:
         """
-        Reads host_id from mod_bi_servicemetrics, fetches host_name from host table,
-        and updates mod_bi_servicemetrics, mod_bi_services with the corresponding host_name.
+        Copy host_name from the hosts table into mod_bi_servicemetrics and
+        mod_bi_services, with set-based UPDATE ... JOIN chunked by host_id.
         """
         with self.conn_mgr.get_connection() as conn:
-            cursor = conn.cursor(dictionary=True)
+            cursor = conn.cursor()
 
             try:
                 cursor.execute(
-                    "SELECT DISTINCT host_id FROM mod_bi_servicemetrics WHERE host_id IS NOT NULL"
+                    "SELECT MIN(host_id), MAX(host_id) FROM hosts "
+                    "WHERE host_id IS NOT NULL"
                 )
-                host_ids = cursor.fetchall()
+                min_id, max_id = cursor.fetchone()
+                if min_id is None:
+                    return 0
 
                 updated_count = 0
-
-                for row in host_ids:
-                    host_id = row["host_id"]
-                    host_info = self.get_host_by_id(host_id)
-
-                    if host_info and host_info.get("name"):
-                        host_name = host_info["name"]
-
-                        update_query = """
-                            UPDATE mod_bi_servicemetrics
-                            SET host_name = %s
-                            WHERE host_id = %s
-                        """
-                        cursor.execute(update_query, (host_name, host_id))
-                        updated_count += cursor.rowcount
-
-                        update_query = """
-                            UPDATE mod_bi_services
-                            SET host_name = %s
-                            WHERE host_id = %s
-                        """
-                        cursor.execute(update_query, (host_name, host_id))
-                        updated_count += cursor.rowcount
+                for table in ("mod_bi_servicemetrics", "mod_bi_services"):
+                    updated_count += self._update_hostnames_by_range(
+                        cursor,
+                        f"""
+                            UPDATE `{table}` t
+                            JOIN hosts h ON h.host_id = t.host_id
+                            SET t.host_name = h.name
+                            WHERE h.host_id BETWEEN %s AND %s
+                            AND h.name IS NOT NULL AND h.name <> ''
+                        """,
+                        min_id,
+                        max_id,
+                    )
 
                 conn.commit()
                 logger.info(
                     f"[mod_bi_servicemetrics|mod_bi_services] Updated host_name for {updated_count} entries."
                 )
+                return updated_count
 
             except mysql.connector.Error as e:
                 logger.error(f"[mod_bi_servicemetrics] Error updating host names: {e}")
                 conn.rollback()
+                return 0
 
-    def fill_hostname_for_host(self):
+    def fill_hostname_for_host(self) -> int:
         """
-        Reads host_id from mod_bi_host, fetches host_name from host table,
-        and updates mod_bi_host with the corresponding host_name.
+        Copy host_name from the hosts table into mod_bi_hosts, with a set-based
+        UPDATE ... JOIN chunked by host_id.
         """
         with self.conn_mgr.get_connection() as conn:
-            cursor = conn.cursor(dictionary=True)
+            cursor = conn.cursor()
 
             try:
                 cursor.execute(
-                    "SELECT DISTINCT host_id FROM hosts WHERE host_id IS NOT NULL"
+                    "SELECT MIN(host_id), MAX(host_id) FROM hosts "
+                    "WHERE host_id IS NOT NULL"
                 )
-                host_ids = cursor.fetchall()
-
-                updated_count = 0
+                min_id, max_id = cursor.fetchone()
+                if min_id is None:
+                    return 0
 
-                for row in host_ids:
-                    host_id = row["host_id"]
-                    host_info = self.get_host_by_id(host_id)
-
-                    if host_info and host_info.get("name"):
-                        host_name = host_info["name"]
-
-                        update_query = """
-                            UPDATE mod_bi_hosts
-                            SET host_name = %s
-                            WHERE host_id = %s
-                        """
-                        cursor.execute(update_query, (host_name, host_id))
-                        updated_count += cursor.rowcount
+                updated_count = self._update_hostnames_by_range(
+                    cursor,
+                    """
+                        UPDATE mod_bi_hosts b
+                        JOIN hosts h ON h.host_id = b.host_id
+                        SET b.host_name = h.name
+                        WHERE h.host_id BETWEEN %s AND %s
+                        AND h.name IS NOT NULL AND h.name <> ''
+                    """,
+                    min_id,
+                    max_id,
+                )
 
                 conn.commit()
                 logger.info(
                     f"[mod_bi_hosts] Updated host_name for {updated_count} entries."
                 )
+                return updated_count
 
             except mysql.connector.Error as e:
                 logger.error(f"[mod_bi_host] Error updating host names: {e}")
                 conn.rollback()
+                return 0
+
+    def sync_hostnames(self) -> int:
+        """Propagate host names to the BI dimension tables, once per run."""
+        start = time.time()
+        updated_count = self.fill_hostname_for_service()
+        updated_count += self.fill_hostname_for_host()
+        logger.info(
+            f"host_name synchronisation: {updated_count} rows touched "
+            f"in {time.time() - start:.2f}s"
+        )
+        return updated_count
 
     def normalize_unix_to_day(self, timestamp: int, preserve_time: bool = True) -> int:
         """Return the Unix timestamp of the same day/hour."""
@@ -1608,16 +3236,128 @@ class DataProcessor:
                 logger.error(f"Error while truncating tables: {e}")
 
 
+# Dump file numbering, shared by every work unit run in the process
+_DUMP_FILE_SEQUENCE = count()
+
+
+class SqlDumpWriter:
+    """
+    Streaming SQL dump of one table into size-rotated, optionally compressed
+    files. Statements are queued and compressed/written by a background thread,
+    so compression does not slow down row generation.
+    """
+
+    EXTENSIONS = {"none": ".sql", "gzip": ".sql.gz", "zstd": ".sql.zst"}
+
+    def __init__(
+        self,
+        output_dir: str,
+        table: str,
+        compression: str = "gzip",
+        max_file_size: int = DUMP_FILE_SIZE_MB * 1024 * 1024,
+    ):
+        if compression == "zstd" and zstandard is None:
+            raise RuntimeError("zstd compression requires the zstandard package")
+
+        self.output_dir = output_dir
+        self.table = table
+        self.compression = compression
+        self.max_file_size = max_file_size
+        self.files: List[str] = []
+
+        self._queue = queue.Queue(maxsize=DUMP_QUEUE_SIZE)
+        self._error = None
+        self._file = None
+        self._file_size = 0
+        self._thread = threading.Thread(target=profile_thread(self._run), daemon=True)
+        self._thread.start()
+
+    def _open_next_file(self):
+        self._close_file()
+        path = os.path.join(
+            self.output_dir,
+            f"{self.table}.{os.getpid()}.{next(_DUMP_FILE_SEQUENCE):05d}"
+            f"{self.EXTENSIONS[self.compression]}",
+        )
+        if self.compression == "gzip":
+            self._file = gzip.open(path, "wb", compresslevel=6)
+        elif self.compression == "zstd":
+            self._file = zstandard.ZstdCompressor().stream_writer(open(path, "wb"))
+        else:
+            self._file = open(path, "wb")
+        self._file.write(b"SET NAMES utf8mb4;\n")
+        self._file_size = 0
+        self.files.append(path)
+        logger.info(f"[{self.table}] Writing SQL dump {path}")
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _run(self):
+        while True:
+            statement = self._queue.get()
+            if statement is None:
+                break
+            if self._error is not None:
+                continue
+            try:
+                data = statement.encode("utf-8")
+                if self._file is None or self._file_size >= self.max_file_size:
+                    self._open_next_file()
+                self._file.write(data)
+                self._file_size += len(data)
+            except Exception as e:
+                self._error = e
+        try:
+            self._close_file()
+        except Exception as e:
+            self._error = self._error or e
+
+    def write(self, statement: str):
+        if self._error is not None:
+            raise self._error
+        self._queue.put(statement)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+
 class DataWriter:
     """Class for writing data."""
 
     def __init__(
-        self, connection_manager: ConnectionManager, inject_mode: bool = False
+        self,
+        connection_manager: ConnectionManager,
+        inject_mode: bool = False,
+        analyzer: Optional[TableAnalyzer] = None,
+        writer_backend: str = "insert",
+        dump_compression: str = "gzip",
+        dump_file_size: int = DUMP_FILE_SIZE_MB * 1024 * 1024,
+        dump_packet_size: int = DUMP_PACKET_SIZE,
+        bulk_session: bool = False,
+        batch_size: int = 0,
+        skip_binlog: bool = False,
     ):
         self.conn_mgr = connection_manager
         self.inject_mode = inject_mode
-        self.table_analyzer = TableAnalyzer(connection_manager)
+        self.bulk_session = bulk_session
+        # sql_log_bin=0 around writes: replicas never receive the rows
+        self.skip_binlog = skip_binlog
+        # Rows per INSERT statement, 0 for the batch_size of the table config
+        self.batch_size = batch_size
+        self.writer_backend = writer_backend
+        self.table_analyzer = analyzer or TableAnalyzer(connection_manager)
         self.output_dir = "sql_dumps"
+        self.dump_compression = dump_compression
+        self.dump_file_size = dump_file_size
+        self.dump_packet_size = dump_packet_size
+        self._dumps: Dict[str, SqlDumpWriter] = {}
+        self._dumps_lock = threading.Lock()
 
         self._id_counters = {}
         self._mandatory_fields_with_no_default = {}
@@ -1688,16 +3428,82 @@ class DataWriter:
             return 0
 
         if self.inject_mode:
-            return self._insert_to_database(table, rows)
+            start = time.perf_counter()
+            if self.writer_backend == "load-data":
+                written = self._load_data_to_database(table, rows)
+            else:
+                written = self._insert_to_database(table, rows)
+            self._record_write(table, written, time.perf_counter() - start)
+            return written
         else:
             return self._write_sql_dump(table, rows)
 
-    def _insert_to_database(self, table: str, rows: List[Dict]) -> int:
-        """Insert data to database in batches with columns and values aligned."""
-        if not rows:
-            return 0
+    def _uses_bulk_session(self, table: str) -> bool:
+        return self.bulk_session and get_table_config(table).bulk_session
 
-        config = get_table_config(table)
+    def _record_write(self, table: str, rows: int, elapsed: float):
+        """Account database write throughput, by session profile."""
+        profile = "bulk" if self._uses_bulk_session(table) else "default"
+        METRICS.add(table, f"write_{profile}", calls=1, seconds=elapsed, rows=rows)
+
+    @contextmanager
+    def _write_session(self, table: str):
+        """
+        Pooled connection for one write call. With the bulk session profile,
+        BULK_SESSION_SETTINGS are applied for the call, and sql_log_bin=0 with
+        --skip-binlog, the previous values being restored afterwards. A
+        variable the user may not change is skipped (logged as a warning for
+        sql_log_bin, which needs SUPER or BINLOG ADMIN). unique_checks stays on
+        for tables whose duplicates are rejected by a unique index. The schema
+        lookups are done before taking the connection: a writer never holds
+        two of them.
+        """
+        settings = {}
+        if self._uses_bulk_session(table):
+            settings.update(BULK_SESSION_SETTINGS)
+            if self._use_insert_ignore(table):
+                settings.pop("unique_checks")
+        if self.skip_binlog:
+            settings["sql_log_bin"] = 0
+
+        with self.conn_mgr.get_connection() as conn:
+            if not settings:
+                yield conn
+                return
+
+            cursor = conn.cursor()
+            saved = {}
+            for name, value in settings.items():
+                try:
+                    cursor.execute(f"SELECT @@SESSION.{name}")
+                    previous = cursor.fetchone()[0]
+                    cursor.execute(f"SET SESSION {name} = %s", (value,))
+                    saved[name] = previous
+                except mysql.connector.Error as e:
+                    log = logger.warning if name == "sql_log_bin" else logger.debug
+                    log(f"[{table}] Cannot set {name} for bulk load: {e}")
+
+            try:
+                yield conn
+            finally:
+                for name, value in saved.items():
+                    try:
+                        cursor.execute(f"SET SESSION {name} = %s", (value,))
+                    except mysql.connector.Error as e:
+                        logger.warning(f"[{table}] Cannot restore {name}: {e}")
+
+    def _use_insert_ignore(self, table: str) -> bool:
+        """Tell if duplicates must be silently skipped by the server."""
+        return (
+            "mod_bi_time" in table.lower()
+            or "mod_bi_metric" in table.lower()
+            or self.table_analyzer.has_unique_index_within(
+                table, get_table_config(table).unique_key_strategy
+            )
+        )
+
+    def _insert_columns(self, table: str) -> Tuple[List[str], List[str]]:
+        """Return the inserted columns and the mandatory generated ones."""
         cols = self._get_columns_order(table)
         mandatory_cols = self._mandatory_fields_with_no_default.get(table, [])
 
@@ -1705,69 +3511,101 @@ class DataWriter:
             if col not in cols:
                 cols.append(col)
 
+        return cols, mandatory_cols
+
+    def _ensure_partitions_for_rows(self, table: str, rows: List[Dict]):
+        """We make sure that all daily partitions exist"""
+        schema = self.table_analyzer.get_table_schema(table)
+        date_col = schema.get("primary_date_column")
+
+        if date_col:
+            candidate_values = column_values(rows, date_col)
+
+            if candidate_values and uses_daily_partitions(table):
+                min_value = min(candidate_values)
+                max_value = max(candidate_values)
+
+                self.table_analyzer.ensure_partitions_for_range(
+                    table, min_value, max_value
+                )
+
+    def _row_values(
+        self,
+        table: str,
+        row: Dict,
+        cols: List[str],
+        mandatory_cols: List[str],
+        row_idx: int,
+    ) -> List[Any]:
+        """Project a row on the columns order, generating mandatory IDs."""
+        for col in mandatory_cols:
+            val = row.get(col)
+            if val is None or val == "" or col not in row:
+                logger.debug(f"Generating ID for {col} in row {row_idx}")
+                row[col] = self._generate_id(table, col)
+
+        row_values = [row.get(col) for col in cols]
+
+        if len(row_values) != len(cols):
+            raise ValueError(
+                f"Mismatch between columns ({len(cols)}) and values ({len(row_values)}) for row {row_idx}"
+            )
+
+        return row_values
+
+    def _iter_row_values(
+        self, table: str, rows, cols: List[str], mandatory_cols: List[str]
+    ):
+        """Yield the values of each row (dicts or a Batch) in cols order."""
+        if isinstance(rows, Batch):
+            if not mandatory_cols:
+                return rows.iter_rows(cols)
+            rows = rows.to_dicts()
+        return (
+            self._row_values(table, row, cols, mandatory_cols, row_idx)
+            for row_idx, row in enumerate(rows)
+        )
+
+    def _insert_to_database(self, table: str, rows: List[Dict]) -> int:
+        """Insert data to database in batches with columns and values aligned."""
+        if not rows:
+            return 0
+
+        batch_size = self.batch_size or get_table_config(table).batch_size
+        cols, mandatory_cols = self._insert_columns(table)
+        # Partitions and schema lookups take their own pooled connection,
+        # before the write session one
+        self._ensure_partitions_for_rows(table, rows)
+        ignore_sql = "IGNORE " if self._use_insert_ignore(table) else ""
+
         total_inserted = 0
 
-        with self.conn_mgr.get_connection() as conn:
+        with self._write_session(table) as conn:
             cursor = conn.cursor()
             try:
                 columns_sql = ", ".join(f"`{col}`" for col in cols)
                 placeholders = "(" + ",".join(["%s"] * len(cols)) + ")"
+                base_sql = f"INSERT {ignore_sql}INTO `{table}` ({columns_sql}) VALUES "
 
-                if "mod_bi_time" in table.lower() or "mod_bi_metric" in table.lower():
-                    base_sql = f"INSERT IGNORE INTO `{table}` ({columns_sql}) VALUES "
-                else:
-                    base_sql = f"INSERT INTO `{table}` ({columns_sql}) VALUES "
-
-                # We make sure that all daily partitions exist
-                schema = self.table_analyzer.get_table_schema(table)
-                date_col = schema.get("primary_date_column")
-
-                if date_col:
-                    candidate_values = [
-                        row.get(date_col)
-                        for row in rows
-                        if row.get(date_col) is not None
-                    ]
-
-                    if (
-                        candidate_values
-                        and "mod_bi_time" not in table.lower()
-                        and "stateevents" not in table.lower()
-                    ):
-                        min_value = min(candidate_values)
-                        max_value = max(candidate_values)
-
-                        self.table_analyzer.ensure_partitions_for_range(
-                            table, min_value, max_value
-                        )
                 # Create the batch
-                for i in range(0, len(rows), config.batch_size):
-                    batch = rows[i : i + config.batch_size]
-                    values_clauses = []
-                    params = []
-
-                    for row_idx, row in enumerate(batch):
-                        for col in mandatory_cols:
-                            val = row.get(col)
-                            if val is None or val == "" or col not in row:
-                                logger.debug(
-                                    f"Generating ID for {col} in row {row_idx}"
-                                )
-                                row[col] = self._generate_id(table, col)
-
-                        row_values = [row.get(col) for col in cols]
-
-                        if len(row_values) != len(cols):
-                            raise ValueError(
-                                f"Mismatch between columns ({len(cols)}) and values ({len(row_values)}) for row {row_idx}"
-                            )
-
-                        values_clauses.append(placeholders)
-                        params.extend(row_values)
+                values = self._iter_row_values(table, rows, cols, mandatory_cols)
+                while True:
+                    batch = list(islice(values, batch_size))
+                    if not batch:
+                        break
 
-                    batch_sql = base_sql + ", ".join(values_clauses)
+                    params = [value for row_values in batch for value in row_values]
+                    batch_sql = base_sql + ", ".join([placeholders] * len(batch))
 
+                    start = time.perf_counter()
                     cursor.execute(batch_sql, params)
+                    METRICS.add(
+                        table,
+                        "insert",
+                        seconds=time.perf_counter() - start,
+                        statements=1,
+                        rows=len(batch),
+                    )
                     total_inserted += len(batch)
 
                 conn.commit()
@@ -1783,6 +3621,173 @@ class DataWriter:
 
         return total_inserted
 
+    def copy_on_server(
+        self,
+        table: str,
+        columns: List[str],
+        select_sql: str,
+        params: Tuple,
+        target_ts: int,
+    ) -> int:
+        """Insert the result of a DataProcessor.server_copy_query SELECT."""
+        if uses_daily_partitions(table):
+            self.table_analyzer.ensure_partitions_for_range(table, target_ts, target_ts)
+
+        columns_sql = ", ".join(f"`{col}`" for col in columns)
+        ignore_sql = "IGNORE " if self._use_insert_ignore(table) else ""
+        copy_sql = f"INSERT {ignore_sql}INTO `{table}` ({columns_sql}) {select_sql}"
+
+        start = time.perf_counter()
+        with self._write_session(table) as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(copy_sql, params)
+                conn.commit()
+                copied = max(cursor.rowcount, 0)
+                METRICS.add(table, "server_copy", statements=1, rows=copied)
+                logger.info(f"Successfully copied {copied} rows into table '{table}'")
+                self._record_write(table, copied, time.perf_counter() - start)
+                return copied
+
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Failed to copy rows into {table}: {e}")
+                raise
+
+    def _load_data_to_database(self, table: str, rows: List[Dict]) -> int:
+        """
+        Load data with LOAD DATA LOCAL INFILE. Rows are streamed as TSV through
+        a named pipe fed by a background thread, so nothing is written to disk.
+        Each LOAD runs in its own transaction, rolled back as a whole on error.
+        """
+        if not rows:
+            return 0
+
+        cols, mandatory_cols = self._insert_columns(table)
+        self._ensure_partitions_for_rows(table, rows)
+
+        columns_sql = ", ".join(f"`{col}`" for col in cols)
+        ignore_sql = "IGNORE " if self._use_insert_ignore(table) else ""
+
+        with tempfile.TemporaryDirectory(prefix="mbi_load_") as tmp_dir:
+            fifo_path = os.path.join(tmp_dir, f"{table}.tsv")
+            os.mkfifo(fifo_path)
+
+            feed_error = []
+            fed_bytes = [0]
+
+            def feed():
+                try:
+                    with open(fifo_path, "wb") as fifo:
+                        for values in self._iter_row_values(
+                            table, rows, cols, mandatory_cols
+                        ):
+                            fed_bytes[0] += fifo.write(to_tsv_line(values))
+                except Exception as e:
+                    feed_error.append(e)
+
+            feeder = threading.Thread(target=profile_thread(feed), daemon=True)
+            feeder.start()
+
+            load_sql = (
+                f"LOAD DATA LOCAL INFILE '{fifo_path}' {ignore_sql}"
+                f"INTO TABLE `{table}` CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+                f"LINES TERMINATED BY '\\n' ({columns_sql})"
+            )
+
+            with self._write_session(table) as conn:
+                cursor = conn.cursor()
+                try:
+                    # Under autocommit, a failed LOAD would keep its first rows
+                    cursor.execute("START TRANSACTION")
+                    cursor.execute(load_sql)
+                    feeder.join()
+                    if feed_error:
+                        raise feed_error[0]
+                    conn.commit()
+                    METRICS.add(
+                        table,
+                        "load_data",
+                        statements=1,
+                        rows=len(rows),
+                        bytes=fed_bytes[0],
+                    )
+                except Exception as e:
+                    conn.rollback()
+                    logger.error(f"Failed to load data into {table}: {e}")
+                    logger.error(f"Columns order was: {cols}")
+                    raise
+                finally:
+                    # Unblock the feeder if the server never opened the pipe
+                    if feeder.is_alive():
+                        fd = os.open(fifo_path, os.O_RDONLY | os.O_NONBLOCK)
+                        feeder.join(timeout=1)
+                        os.close(fd)
+                    feeder.join()
+
+        logger.info(f"Successfully loaded {len(rows)} rows into table '{table}'")
+        return len(rows)
+
+    def _write_sql_dump(self, table: str, rows: List[Dict]) -> int:
+        """
+        Append rows to the table SQL dump as extended INSERT statements, each
+        kept under the dump packet size (max_allowed_packet of the target).
+        """
+        if not rows:
+            return 0
+
+        with self._dumps_lock:
+            if table not in self._dumps:
+                self._dumps[table] = SqlDumpWriter(
+                    self.output_dir, table, self.dump_compression, self.dump_file_size
+                )
+            dump = self._dumps[table]
+
+        cols, mandatory_cols = self._insert_columns(table)
+        columns_sql = ", ".join(f"`{col}`" for col in cols)
+        keyword = "INSERT IGNORE" if self._use_insert_ignore(table) else "INSERT"
+        base_sql = f"{keyword} INTO `{table}` ({columns_sql}) VALUES\n"
+
+        values_clauses = []
+        # Sizes are counted in encoded bytes, as max_allowed_packet
+        base_size = len(base_sql.encode("utf-8"))
+        statement_size = base_size
+
+        with METRICS.timed(table, "dump", rows=len(rows)) as metrics:
+            for row_values in self._iter_row_values(table, rows, cols, mandatory_cols):
+                clause = "(" + ",".join(to_sql_literal(v) for v in row_values) + ")"
+                clause_size = (
+                    len(clause) if clause.isascii() else len(clause.encode("utf-8"))
+                )
+
+                # +2 for the ",\n" separator / ";\n" terminator
+                if values_clauses and (
+                    statement_size + clause_size + 2 > self.dump_packet_size
+                ):
+                    dump.write(base_sql + ",\n".join(values_clauses) + ";\n")
+                    metrics["statements"] = metrics.get("statements", 0) + 1
+                    metrics["bytes"] = metrics.get("bytes", 0) + statement_size
+                    values_clauses = []
+                    statement_size = base_size
+
+                values_clauses.append(clause)
+                statement_size += clause_size + 2
+
+            if values_clauses:
+                dump.write(base_sql + ",\n".join(values_clauses) + ";\n")
+                metrics["statements"] = metrics.get("statements", 0) + 1
+                metrics["bytes"] = metrics.get("bytes", 0) + statement_size
+
+        return len(rows)
+
+    def close(self):
+        """Flush and close every SQL dump opened by this writer."""
+        dumps, self._dumps = self._dumps, {}
+        for table, dump in dumps.items():
+            dump.close()
+            logger.info(f"[{table}] SQL dump written to {len(dump.files)} file(s)")
+
     def _get_columns_order(self, table: str) -> List[str]:
         """
         Récupère l'ordre exact des colonnes de la table depuis la base de données.
@@ -1804,46 +3809,834 @@ class DataWriter:
                 raise
 
 
-def process_table(args: Tuple[Config, str]) -> Tuple[str, int, str, Dict]:
-    """Process a complete table."""
+class WritePipeline:
+    """
+    Bounded buffer between row generation and writer threads, so that the
+    generation of a date overlaps the write of the previous ones. The buffer is
+    capped by a number of rows, which bounds the memory held in flight.
+    """
+
+    def __init__(self, writer: DataWriter, max_rows: int, workers: int = 1):
+        self.writer = writer
+        self.max_rows = max_rows
+        self.written = 0
+
+        self._batches = deque()
+        self._buffered_rows = 0
+        self._closing = False
+        self._error = None
+        self._cond = threading.Condition()
+        self._threads = [
+            threading.Thread(target=profile_thread(self._run), daemon=True)
+            for _ in range(max(workers, 1))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._batches and not self._closing:
+                    self._cond.wait()
+                if not self._batches:
+                    return
+                table, rows = self._batches.popleft()
+
+            try:
+                written = self.writer._write_data(table, rows)
+            except Exception as e:
+                written = 0
+                with self._cond:
+                    self._error = self._error or e
+
+            with self._cond:
+                self._buffered_rows -= len(rows)
+                self.written += written
+                self._cond.notify_all()
+
+    def submit(self, table: str, rows: List[Dict]):
+        """
+        Queue rows for writing, waiting while the buffer is full. Real data
+        producers wait with their unbuffered source stream unread: a wait
+        longer than the net_write_timeout of the source server drops the
+        stream and fails the unit.
+        """
+        with self._cond:
+            while (
+                self._buffered_rows
+                and self._buffered_rows + len(rows) > self.max_rows
+                and self._error is None
+            ):
+                self._cond.wait()
+            if self._error is not None:
+                raise self._error
+            self._batches.append((table, rows))
+            self._buffered_rows += len(rows)
+            self._cond.notify_all()
+
+    def stop(self):
+        """Let the writers drain the buffer and wait for them."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def wait(self) -> int:
+        """Wait for every queued row to be written and return the row count."""
+        self.stop()
+        if self._error is not None:
+            raise self._error
+        return self.written
+
+
+class CheckpointJournal:
+    """
+    Local SQLite journal of the run: the (missing_date, source_date) pairs
+    planned for each table, when their processing started and once their rows
+    are written, so that an interrupted run can be resumed without computing
+    the missing dates again. Each call opens its own connection, which lets
+    every worker process share the same file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS units (
+                    table_name TEXT NOT NULL,
+                    target_date TEXT NOT NULL,
+                    source_date TEXT NOT NULL,
+                    started_at REAL,
+                    completed_at REAL,
+                    row_count INTEGER,
+                    PRIMARY KEY (table_name, target_date)
+                )
+                """
+            )
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS dropped_indexes (
+                    table_name TEXT NOT NULL,
+                    index_name TEXT NOT NULL,
+                    clause TEXT NOT NULL,
+                    PRIMARY KEY (table_name, index_name)
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self):
+        with closing(sqlite3.connect(self.path, timeout=60)) as db:
+            with db:
+                yield db
+
+    def record_plan(self, table: str, assignments: List[Tuple[datetime, datetime]]):
+        """Replace the plan of a table."""
+        with self._connect() as db:
+            db.execute("DELETE FROM units WHERE table_name = ?", (table,))
+            db.executemany(
+                "INSERT INTO units (table_name, target_date, source_date) "
+                "VALUES (?, ?, ?)",
+                [
+                    (table, target.isoformat(), source.isoformat())
+                    for target, source in assignments
+                ],
+            )
+
+    def load_plan(
+        self, table: str
+    ) -> Optional[Tuple[List[Tuple[datetime, datetime]], int, int]]:
+        """
+        Return the pending assignments of a table with the number of completed
+        dates and their rows, or None when the table has no recorded plan.
+        """
+        with self._connect() as db:
+            units = db.execute(
+                "SELECT target_date, source_date, completed_at, row_count "
+                "FROM units WHERE table_name = ? ORDER BY target_date",
+                (table,),
+            ).fetchall()
+
+        if not units:
+            return None
+
+        pending = [
+            (datetime.fromisoformat(target), datetime.fromisoformat(source))
+            for target, source, completed_at, _ in units
+            if completed_at is None
+        ]
+        completed = [
+            row_count or 0
+            for _, _, completed_at, row_count in units
+            if completed_at is not None
+        ]
+        return pending, len(completed), sum(completed)
+
+    def mark_started(self, table: str, target_date: datetime) -> bool:
+        """Flag a date as started, and tell if a previous run had started it."""
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT started_at FROM units "
+                "WHERE table_name = ? AND target_date = ?",
+                (table, target_date.isoformat()),
+            ).fetchone()
+            db.execute(
+                "UPDATE units SET started_at = ? "
+                "WHERE table_name = ? AND target_date = ?",
+                (time.time(), table, target_date.isoformat()),
+            )
+        return bool(row and row[0] is not None)
+
+    def record_dropped_index(self, table: str, name: str, clause: str):
+        """Remember an index before it is dropped, to rebuild it after a crash."""
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO dropped_indexes VALUES (?, ?, ?)",
+                (table, name, clause),
+            )
+
+    def dropped_indexes(self, table: Optional[str] = None) -> Dict[str, Dict]:
+        """Indexes dropped and not rebuilt yet, by table."""
+        query = "SELECT table_name, index_name, clause FROM dropped_indexes"
+        params = ()
+        if table:
+            query += " WHERE table_name = ?"
+            params = (table,)
+        with self._connect() as db:
+            rows = db.execute(query, params).fetchall()
+
+        dropped = {}
+        for table_name, name, clause in rows:
+            dropped.setdefault(table_name, {})[name] = clause
+        return dropped
+
+    def forget_dropped_indexes(self, table: str, names: List[str]):
+        with self._connect() as db:
+            db.executemany(
+                "DELETE FROM dropped_indexes WHERE table_name = ? AND index_name = ?",
+                [(table, name) for name in names],
+            )
+
+    def mark_completed(self, table: str, dates: List[Tuple[datetime, int]]):
+        """Flag dates as written, with their row counts."""
+        now = time.time()
+        with self._connect() as db:
+            db.executemany(
+                "UPDATE units SET completed_at = ?, row_count = ? "
+                "WHERE table_name = ? AND target_date = ?",
+                [
+                    (now, row_count, table, target_date.isoformat())
+                    for target_date, row_count in dates
+                ],
+            )
+
+
+@dataclass
+class TablePlan:
+    """Outcome of the preparation of a table, before its work units run."""
+
+    table: str
+    status: str
+    stats: Dict = field(default_factory=dict)
+    # (missing_date, source_date) pairs left to process
+    assignments: List[Tuple[datetime, datetime]] = field(default_factory=list)
+    # RunMetrics drained by the process which prepared the table
+    metrics: Dict = field(default_factory=dict)
+
+
+def table_granularity(table_name: str) -> str:
+    """Return the time granularity of a table."""
+    return (
+        "month"
+        if is_monthly_table(table_name)
+        else "hour"
+        if is_hourly_table(table_name)
+        else "day"
+    )
+
+
+def create_shadow_table(cfg: Config, table: str) -> str:
+    """
+    Create the empty shadow of a table, with the same DDL and partitions. With
+    --resume, an existing shadow is reused as the interrupted run left it.
+    """
+    shadow = table + SHADOW_SUFFIX
+    conn_mgr = ConnectionManager(cfg)
+
+    with conn_mgr.get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            if cfg.resume:
+                cursor.execute("SHOW TABLES LIKE %s", (shadow,))
+                if cursor.fetchall():
+                    logger.info(f"[{table}] Resuming into shadow table {shadow}")
+                    return shadow
+
+            with METRICS.timed(table, "shadow_create", statements=2):
+                cursor.execute(f"DROP TABLE IF EXISTS `{shadow}`")
+                cursor.execute(f"CREATE TABLE `{shadow}` LIKE `{table}`")
+            logger.info(f"[{table}] Shadow table {shadow} created")
+
+        except mysql.connector.Error as e:
+            logger.error(f"[{table}] Error creating shadow table: {e}")
+            raise
+
+    if cfg.journal:
+        journal = CheckpointJournal(cfg.journal)
+        journal.forget_dropped_indexes(shadow, list(journal.dropped_indexes(shadow)))
+    return shadow
+
+
+def _shadow_key_columns(table: str, schema: Dict) -> List[str]:
+    """Columns telling a shadow row from a live one, as the existing keys filter."""
+    key_cols = [
+        col
+        for col in get_table_config(table).unique_key_strategy
+        if col in schema["columns"]
+    ]
+    if key_cols:
+        return key_cols
+    return [col for col in schema["columns"] if col not in TIME_COLUMNS_CANDIDATES][
+        :3
+    ] or list(schema["columns"])
+
+
+def _exchange_shadow_partitions(
+    cursor, table: str, shadow: str, key_cols: List[str]
+) -> int:
+    """
+    Swap the days of the shadow into the live table, one partition at a time:
+    shadow rows duplicating a live row are dropped, the live rows of the day
+    are copied into the shadow partition, which then goes through a
+    non-partitioned staging table into the live table with two EXCHANGE
+    PARTITION. The tables stay write-locked from the copy through both
+    exchanges, so rows the ETL writes meanwhile wait for the lock instead of
+    being lost; writes are blocked for the copy of one day only. Days whose
+    partition the live table lacks stay in the shadow. Returns the number of
+    days swapped.
+    """
+    cursor.execute(
+        "SELECT PARTITION_NAME FROM INFORMATION_SCHEMA.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s "
+        "AND PARTITION_NAME IS NOT NULL",
+        (table,),
+    )
+    live_partitions = {row[0] for row in cursor.fetchall()}
+    cursor.execute(
+        "SELECT PARTITION_NAME FROM INFORMATION_SCHEMA.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s "
+        "AND PARTITION_NAME IS NOT NULL ORDER BY PARTITION_ORDINAL_POSITION",
+        (shadow,),
+    )
+    shadow_partitions = [
+        row[0] for row in cursor.fetchall() if row[0] in live_partitions
+    ]
+
+    staging = f"{table}__swap"
+    cursor.execute(f"DROP TABLE IF EXISTS `{staging}`")
+    cursor.execute(f"CREATE TABLE `{staging}` LIKE `{table}`")
+    cursor.execute(f"ALTER TABLE `{staging}` REMOVE PARTITIONING")
+
+    same_key = " AND ".join(f"l.`{col}` <=> s.`{col}`" for col in key_cols)
+    # Under LOCK TABLES, each alias of a statement needs its own lock
+    lock_sql = (
+        f"LOCK TABLES `{table}` WRITE, `{table}` AS l READ, `{shadow}` WRITE, "
+        f"`{shadow}` AS s WRITE, `{staging}` WRITE"
+    )
+    swapped = 0
+    for partition in shadow_partitions:
+        cursor.execute(f"SELECT 1 FROM `{shadow}` PARTITION (`{partition}`) LIMIT 1")
+        if not cursor.fetchall():
+            continue
+
+        cursor.execute(lock_sql)
+        try:
+            cursor.execute(
+                f"DELETE s FROM `{shadow}` PARTITION (`{partition}`) AS s "
+                f"WHERE EXISTS (SELECT 1 FROM `{table}` PARTITION (`{partition}`) "
+                f"AS l WHERE {same_key})"
+            )
+            cursor.execute(
+                f"INSERT INTO `{shadow}` "
+                f"SELECT * FROM `{table}` PARTITION (`{partition}`)"
+            )
+            cursor.execute(
+                f"ALTER TABLE `{shadow}` EXCHANGE PARTITION `{partition}` "
+                f"WITH TABLE `{staging}`"
+            )
+            cursor.execute(
+                f"ALTER TABLE `{table}` EXCHANGE PARTITION `{partition}` "
+                f"WITH TABLE `{staging}`"
+            )
+        finally:
+            cursor.execute("UNLOCK TABLES")
+        cursor.execute(f"TRUNCATE TABLE `{staging}`")
+        swapped += 1
+
+    cursor.execute(f"DROP TABLE `{staging}`")
+    return swapped
+
+
+def _copy_shadow_days(
+    cursor, table: str, shadow: str, schema: Dict, key_cols: List[str]
+) -> int:
+    """
+    Copy the shadow rows into the live table one day per transaction, for the
+    tables which cannot exchange partitions (not partitioned, or with an
+    auto-increment column renumbered by the live table) and the days left by
+    the exchange. Shadow rows duplicating a live row are skipped. Tables
+    without a date column are copied at once. Returns the number of days copied.
+    """
+    date_col = schema["primary_date_column"]
+    columns = [col for col in schema["columns"] if col not in schema["auto_increment"]]
+    insert_sql = (
+        f"INSERT INTO `{table}` ({', '.join(f'`{col}`' for col in columns)}) "
+        f"SELECT {', '.join(f's.`{col}`' for col in columns)} FROM `{shadow}` AS s "
+        f"WHERE NOT EXISTS (SELECT 1 FROM `{table}` AS l WHERE "
+        + " AND ".join(f"l.`{col}` <=> s.`{col}`" for col in key_cols)
+        + ")"
+    )
+    if not date_col:
+        cursor.execute(insert_sql)
+        cursor.execute("COMMIT")
+        return 1
+
+    cursor.execute(f"SELECT DISTINCT `{date_col}` DIV 86400 FROM `{shadow}`")
+    days = sorted(row[0] for row in cursor.fetchall() if row[0] is not None)
+    for day in days:
+        cursor.execute(
+            f"{insert_sql} AND s.`{date_col}` >= %s AND s.`{date_col}` < %s",
+            (day * 86400, (day + 1) * 86400),
+        )
+        cursor.execute("COMMIT")
+    return len(days)
+
+
+def finish_shadow_table(cfg: Config, table: str, status: str):
+    """
+    Merge a filled shadow table into the live table and drop it. Days are
+    swapped in one by one, with EXCHANGE PARTITION when the table is
+    partitioned, so readers only see per-day switches and the rows written
+    meanwhile by the ETL on other days are untouched. With --truncate, the
+    shadow holds the whole table and replaces it with one atomic RENAME TABLE.
+    A failed table keeps its shadow for --resume.
+    """
+    if not cfg.shadow_load:
+        return
+
+    shadow = table + SHADOW_SUFFIX
+    if status.startswith("ERROR"):
+        logger.warning(f"[{table}] Shadow table {shadow} kept for --resume")
+        return
+
+    conn_mgr = ConnectionManager(cfg)
+    with conn_mgr.get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Tables without missing dates have no shadow
+            cursor.execute("SHOW TABLES LIKE %s", (shadow,))
+            if not cursor.fetchall():
+                return
+
+            if cfg.truncate:
+                # Only a complete shadow replaces the table
+                if status not in ("OK", "COMPLETE"):
+                    cursor.execute(f"DROP TABLE `{shadow}`")
+                    return
+                old = f"{table}__old"
+                with METRICS.timed(table, "shadow_swap", statements=3):
+                    cursor.execute(f"DROP TABLE IF EXISTS `{old}`")
+                    cursor.execute(
+                        f"RENAME TABLE `{table}` TO `{old}`, `{shadow}` TO `{table}`"
+                    )
+                    cursor.execute(f"DROP TABLE `{old}`")
+                logger.info(f"[{table}] Shadow table swapped in")
+                return
+
+            schema = TableAnalyzer(conn_mgr).get_table_schema(table)
+            key_cols = _shadow_key_columns(table, schema)
+            layout = TableAnalyzer(conn_mgr).get_partition_layout(table)
+            with METRICS.timed(table, "shadow_swap") as metrics:
+                days = 0
+                if layout["partitioned"] and not schema["auto_increment"]:
+                    days = _exchange_shadow_partitions(cursor, table, shadow, key_cols)
+                days += _copy_shadow_days(cursor, table, shadow, schema, key_cols)
+                cursor.execute(f"DROP TABLE `{shadow}`")
+                metrics["days"] = days
+            logger.info(f"[{table}] {days} days of the shadow table merged in")
+
+        except mysql.connector.Error as e:
+            logger.error(f"[{table}] Error merging shadow table: {e}")
+            raise
+
+
+def drop_secondary_indexes(cfg: Config, table: str) -> List[str]:
+    """
+    Drop the secondary indexes of a table opted in for rebuild, each one
+    being journaled first so that an interrupted run can rebuild it.
+    """
+    if not (cfg.rebuild_indexes and cfg.inject and cfg.journal and not cfg.dry_run):
+        return []
+    if not get_table_config(table).rebuild_indexes:
+        return []
+
+    journal = CheckpointJournal(cfg.journal)
+    analyzer = TableAnalyzer(ConnectionManager(cfg))
+
+    dropped = []
+    with METRICS.timed(table, "drop_indexes") as metrics:
+        for name, clause in analyzer.secondary_index_clauses(table).items():
+            journal.record_dropped_index(table, name, clause)
+            if analyzer.drop_index(table, name):
+                dropped.append(name)
+            else:
+                journal.forget_dropped_indexes(table, [name])
+        metrics["statements"] = len(dropped)
+
+    if dropped:
+        logger.info(f"[{table}] Dropped indexes for the load: {', '.join(dropped)}")
+    return dropped
+
+
+def restore_secondary_indexes(
+    args: Tuple[Config, Optional[str]],
+) -> Tuple[float, List[str]]:
+    """
+    Rebuild the journaled indexes of a table (of every table with None) in
+    one ALTER TABLE per table. A failed rebuild is logged and stays in the
+    journal, retried by the next run. Returns the elapsed time and the tables
+    whose rebuild failed.
+    """
+    cfg, table = args
+    if not cfg.journal or cfg.dry_run or not cfg.inject:
+        return 0.0, []
+
+    start = time.time()
+    journal = CheckpointJournal(cfg.journal)
+    analyzer = TableAnalyzer(ConnectionManager(cfg))
+    failed = []
+
+    for table_name, clauses in journal.dropped_indexes(table).items():
+        logger.info(f"[{table_name}] Rebuilding indexes: {', '.join(clauses)}")
+        try:
+            analyzer.add_indexes(table_name, list(clauses.values()))
+        except mysql.connector.Error as e:
+            # A shadow table dropped since then has nothing to rebuild
+            if e.errno != 1146:
+                logger.error(
+                    f"[{table_name}] Index rebuild failed, kept in the journal "
+                    f"for the next run: {e}"
+                )
+                failed.append(table_name)
+                continue
+        journal.forget_dropped_indexes(table_name, list(clauses))
+
+    return time.time() - start, failed
+
+
+def prepare_run(cfg: Config, table_names: List[str]) -> Dict[str, float]:
+    """
+    Run-level preparation, done once before the tables are processed: sync
+    host names of the BI dimensions, populate mod_bi_time for the union of
+    every table expected dates, create the daily partitions of the coverage
+    window (or write their DDL for the SQL dumps) and inject data_bin.
+    Returns the elapsed time of each step.
+    """
+    timings = {}
+    if cfg.dry_run:
+        return timings
+
+    conn_mgr = ConnectionManager(cfg)
+    analyzer = TableAnalyzer(conn_mgr)
+    processor = DataProcessor(conn_mgr, analyzer, cfg)
+    writer = DataWriter(
+        conn_mgr,
+        cfg.inject,
+        analyzer,
+        cfg.writer,
+        cfg.dump_compression,
+        cfg.dump_file_size * 1024 * 1024,
+        cfg.dump_packet_size,
+        batch_size=cfg.batch_size,
+        skip_binlog=cfg.skip_binlog,
+    )
+
+    try:
+        # Indexes left dropped by an interrupted run
+        if cfg.inject and cfg.journal:
+            timings["indexes"] = restore_secondary_indexes((cfg, None))[0]
+
+        ##(Optionnal) To fill some tables
+        if cfg.sync_hostnames:
+            start = time.time()
+            processor.sync_hostnames()
+            timings["hostnames"] = time.time() - start
+
+        # Populate mod_bi_time
+        start = time.time()
+        days = set()
+        for granularity in {table_granularity(table) for table in table_names}:
+            for date in generate_expected_dates(granularity):
+                days.add(date.replace(hour=0, minute=0, second=0, microsecond=0))
+        datebitime = processor.generate_bi_time_rows(sorted(days))
+        writer._write_data("mod_bi_time", datebitime)
+        timings["mod_bi_time"] = time.time() - start
+
+        if cfg.inject:
+            # Create the daily partitions of the coverage window
+            start = time.time()
+            for table in table_names:
+                if not uses_daily_partitions(table):
+                    continue
+                dates = generate_expected_dates(table_granularity(table))
+                analyzer.ensure_partitions_for_range(table, dates[0], dates[-1])
+            timings["partitions"] = time.time() - start
+
+            start = time.time()
+            writer._inject_data_bin(1329)
+            timings["data_bin"] = time.time() - start
+        else:
+            # Dumps hold no partition DDL: the partitions of the coverage
+            # window go to a file replayed before them
+            start = time.time()
+            statements = []
+            for table in table_names:
+                if not uses_daily_partitions(table):
+                    continue
+                dates = generate_expected_dates(table_granularity(table))
+                missing = analyzer.plan_daily_partitions(table, dates[0], dates[-1])
+                if missing:
+                    statements.append(analyzer.partition_ddl(table, missing) + ";\n")
+            path = os.path.join(writer.output_dir, PARTITIONS_DUMP_FILE)
+            with open(path, "w", encoding="utf-8") as f:
+                f.writelines(statements)
+            logger.info(f"Partition DDL of {len(statements)} tables written to {path}")
+            timings["partitions"] = time.time() - start
+    finally:
+        writer.close()
+
+    for step, elapsed in timings.items():
+        METRICS.add("(run)", f"run_{step}", calls=1, seconds=elapsed)
+    logger.info(
+        "Run preparation done: "
+        + ", ".join(f"{step} {elapsed:.2f}s" for step, elapsed in timings.items())
+    )
+    return timings
+
+
+# Set while a worker entry point runs under the profiler (--profile)
+_PROFILING = threading.local()
+PROFILE_MEMORY_TOP = 15
+
+
+def profiled(func):
+    """
+    Run a worker entry point taking (config, table, ...) under cProfile and
+    tracemalloc with --profile. Profiles of a table are accumulated per
+    process in <profile_dir>/<table>.<pid>.part.pstats, merged by
+    merge_profiles; peak traced memory and the top allocations are appended
+    to <table>.memory.txt. Threads started through profile_thread during the
+    call are profiled too and merged into the same profile.
+    """
+
+    @functools.wraps(func)
+    def wrapper(args):
+        cfg, table_name = args[0], args[1]
+        if not cfg.profile_dir or getattr(_PROFILING, "active", False):
+            return func(args)
+
+        _PROFILING.active = True
+        _PROFILING.threads = threads = []
+        os.makedirs(cfg.profile_dir, exist_ok=True)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        else:
+            tracemalloc.start()
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            try:
+                return func(args)
+            finally:
+                profiler.disable()
+        finally:
+            _PROFILING.active = False
+            _PROFILING.threads = None
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            if not tracing:
+                tracemalloc.stop()
+
+            part = os.path.join(
+                cfg.profile_dir, f"{table_name}.{os.getpid()}.part.pstats"
+            )
+            # Threads still running are left out
+            stats = pstats.Stats(profiler, *list(threads))
+            if os.path.exists(part):
+                stats.add(part)
+            stats.dump_stats(part)
+
+            with open(
+                os.path.join(cfg.profile_dir, f"{table_name}.memory.txt"),
+                "a",
+                encoding="utf-8",
+            ) as f:
+                f.write(
+                    f"== {func.__name__} pid {os.getpid()} "
+                    f"peak {peak / 1024 / 1024:.1f} MB, "
+                    f"top allocations when done:\n"
+                )
+                for stat in snapshot.statistics("lineno")[:PROFILE_MEMORY_TOP]:
+                    f.write(f"  {stat}\n")
+
+    return wrapper
+
+
+def profile_thread(target):
+    """
+    Wrap the target of a thread started by a profiled worker call, so that the
+    thread runs under its own cProfile merged into the worker profile.
+    """
+    threads = getattr(_PROFILING, "threads", None)
+    if threads is None:
+        return target
+
+    @functools.wraps(target)
+    def run(*args, **kwargs):
+        # Threads started by this one are profiled as well
+        _PROFILING.threads = threads
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return target(*args, **kwargs)
+        finally:
+            profiler.disable()
+            threads.append(profiler)
+
+    return run
+
+
+def merge_profiles(profile_dir: str, top: int) -> Optional[str]:
+    """
+    Merge the per-process profiles into <profile_dir>/<table>.pstats and
+    return the top functions by own time over all tables followed by the
+    peak traced memory of each table, also written to <profile_dir>/summary.txt.
+    """
+    parts: Dict[str, List[str]] = {}
+    peaks: Dict[str, float] = {}
+    for name in sorted(os.listdir(profile_dir)):
+        table = name.split(".", 1)[0]
+        if name.endswith(".part.pstats"):
+            parts.setdefault(table, []).append(os.path.join(profile_dir, name))
+        elif name.endswith(".memory.txt"):
+            with open(os.path.join(profile_dir, name), encoding="utf-8") as f:
+                for line in f:
+                    match = re.search(r"peak ([\d.]+) MB", line)
+                    if line.startswith("== ") and match:
+                        peaks[table] = max(peaks.get(table, 0), float(match[1]))
+    if not parts:
+        return None
+
+    merged = []
+    for table, paths in parts.items():
+        path = os.path.join(profile_dir, f"{table}.pstats")
+        pstats.Stats(*paths).dump_stats(path)
+        for part in paths:
+            os.remove(part)
+        merged.append(path)
+
+    stream = io.StringIO()
+    pstats.Stats(*merged, stream=stream).sort_stats("tottime").print_stats(top)
+    stream.write("Peak traced memory by table:\n")
+    for table, peak in sorted(peaks.items(), key=lambda item: item[1], reverse=True):
+        stream.write(f"  {table:40} {peak:10.1f} MB\n")
+    summary = stream.getvalue()
+    with open(os.path.join(profile_dir, "summary.txt"), "w", encoding="utf-8") as f:
+        f.write(summary)
+    return summary
+
+
+@profiled
+def prepare_table(args: Tuple[Config, str]) -> TablePlan:
+    """Compute the missing dates of a table and prepare it for writing."""
+    with METRICS.timed(args[1], "prepare_table"):
+        plan = _plan_table(args)
+    plan.metrics = METRICS.drain()
+    return plan
+
+
+def _plan_table(args: Tuple[Config, str]) -> TablePlan:
     cfg, table_name = args
 
     try:
         conn_mgr = ConnectionManager(cfg)
         analyzer = TableAnalyzer(conn_mgr)
         processor = DataProcessor(conn_mgr, analyzer, cfg)
-        writer = DataWriter(conn_mgr, cfg.inject)
 
-        if cfg.truncate:
+        # Shadow load: missing dates are computed on the live table and only
+        # tables with missing dates get a shadow receiving the writes, except
+        # with --truncate where the empty shadow replaces the whole table
+        target = coverage_table(cfg, table_name)
+        shadow_load = cfg.shadow_load and not cfg.truncate
+        if cfg.shadow_load and cfg.truncate:
+            create_shadow_table(cfg, table_name)
+
+        # Resume: the plan of the interrupted run, without its completed dates
+        journal = CheckpointJournal(cfg.journal) if cfg.journal else None
+        if cfg.resume and journal:
+            resumed = journal.load_plan(table_name)
+            if resumed is not None:
+                pending, completed, completed_rows = resumed
+                logger.info(
+                    f"[{table_name}] Resuming: {completed} dates already done, "
+                    f"{len(pending)} left"
+                )
+                if shadow_load and pending:
+                    create_shadow_table(cfg, table_name)
+                return TablePlan(
+                    table_name,
+                    "OK" if pending else "COMPLETE",
+                    {
+                        "missing": len(pending),
+                        "resumed": completed,
+                        "resumed_rows": completed_rows,
+                    },
+                    pending,
+                )
+
+        if cfg.truncate and not cfg.shadow_load:
             processor.truncate_tables([table_name])
 
         # Table analysis
         schema = analyzer.get_table_schema(table_name)
         if not schema["primary_date_column"]:
-            return table_name, 0, "NO_DATE_COLUMN", {}
+            return TablePlan(table_name, "NO_DATE_COLUMN")
 
-        granularity = (
-            "month"
-            if is_monthly_table(table_name)
-            else "hour"
-            if is_hourly_table(table_name)
-            else "day"
-        )
+        granularity = table_granularity(table_name)
 
         # Calculate missing dates
         expected_dates = generate_expected_dates(granularity)
-        existing_dates = processor.fetch_existing_dates(table_name, granularity)
-        missing_dates = sorted(set(expected_dates) - existing_dates)
+        coverage = None
+        if cfg.coverage_mode == "entity":
+            coverage = processor.analyze_entity_coverage(
+                target, granularity, expected_dates
+            )
 
-        # Populate mod_bi_time
-        datebitime = processor.generate_bi_time_rows(expected_dates)
-        writer._insert_to_database("mod_bi_time", datebitime)
-        writer._inject_data_bin(1329)
+        # A date is missing as soon as one of its entities has no row
+        if coverage is not None:
+            missing_dates = coverage.incomplete_buckets()
+            existing_dates = set(expected_dates) - set(missing_dates)
+        else:
+            existing_dates = processor.fetch_existing_dates(target, granularity)
+            missing_dates = sorted(set(expected_dates) - existing_dates)
 
         if not missing_dates:
-            return (
+            return TablePlan(
                 table_name,
-                0,
                 "COMPLETE",
                 {"missing": 0, "expected": len(expected_dates)},
             )
@@ -1860,32 +4653,16 @@ def process_table(args: Tuple[Config, str]) -> Tuple[str, int, str, Dict]:
             )
 
         if not source_dates:
-            return table_name, 0, "NO_SOURCE_DATA", {"missing": len(missing_dates)}
+            return TablePlan(
+                table_name, "NO_SOURCE_DATA", {"missing": len(missing_dates)}
+            )
 
         logger.info(f"[{table_name}] Processing {len(missing_dates)} missing dates")
 
-        # Data processing
-        total_processed = 0
-        src_idx = 0
-
-        for missing_date in tqdm(missing_dates, desc=f"{table_name}", leave=False):
-            logger.info(f"Processing {table_name}:{missing_date}")
-            source_date = source_dates[src_idx % len(source_dates)]
-            src_idx += 1
-
-            if cfg.dry_run:
-                logger.info(
-                    f"[{table_name}] DRY RUN: would process {missing_date} from {source_date}"
-                )
-                continue
-
-            transformed_rows = processor.change_date_into_row(
-                table_name, missing_date, source_date
-            )
-
-            if transformed_rows:
-                processed = writer._write_data(table_name, transformed_rows)
-                total_processed += processed
+        assignments = [
+            (missing_date, source_dates[src_idx % len(source_dates)])
+            for src_idx, missing_date in enumerate(missing_dates)
+        ]
 
         stats = {
             "missing": len(missing_dates),
@@ -1893,12 +4670,328 @@ def process_table(args: Tuple[Config, str]) -> Tuple[str, int, str, Dict]:
             "existing": len(existing_dates),
             "source_dates": len(source_dates),
         }
+        if coverage is not None:
+            stats["missing_cells"] = coverage.missing_cells()
+
+        if journal:
+            journal.record_plan(table_name, assignments)
+        if shadow_load:
+            create_shadow_table(cfg, table_name)
+
+        return TablePlan(table_name, "OK", stats, assignments)
+
+    except Exception as e:
+        logger.error(f"[{table_name}] Error: {e}")
+        return TablePlan(table_name, f"ERROR: {str(e)}")
 
-        return table_name, total_processed, "OK", stats
+
+@profiled
+def process_unit(
+    args: Tuple[
+        Config, str, List[Tuple[datetime, datetime]], Optional[DimensionSnapshot]
+    ],
+) -> Tuple[str, int, Optional[str], Dict]:
+    """Process a work unit: a slice of the missing dates of a prepared table."""
+    cfg, table_name, assignments, dimensions = args
+    # Source rows are read from table_name, written into target
+    target = target_table(cfg, table_name)
+
+    try:
+        conn_mgr = ConnectionManager(cfg)
+        analyzer = TableAnalyzer(conn_mgr)
+        processor = DataProcessor(conn_mgr, analyzer, cfg, dimensions)
+        writer = DataWriter(
+            conn_mgr,
+            cfg.inject,
+            analyzer,
+            cfg.writer,
+            cfg.dump_compression,
+            cfg.dump_file_size * 1024 * 1024,
+            cfg.dump_packet_size,
+            cfg.bulk_session,
+            cfg.batch_size,
+            cfg.skip_binlog,
+        )
+
+        # Dates are journaled once their rows are written: right away for
+        # direct writes, after the pipeline and the SQL dumps are flushed
+        # otherwise
+        journal = CheckpointJournal(cfg.journal) if cfg.journal else None
+        granularity = table_granularity(table_name)
+        direct_writes = cfg.inject and not cfg.pipeline_max_rows
+        completed = []
+
+        # Data processing
+        total_processed = 0
+        pipeline = None
+        if cfg.pipeline_max_rows and not cfg.dry_run:
+            pipeline = WritePipeline(
+                writer, cfg.pipeline_max_rows, cfg.pipeline_writers
+            )
+
+        try:
+            for missing_date, source_date in assignments:
+                logger.info(f"Processing {table_name}:{missing_date}")
+
+                if cfg.dry_run:
+                    logger.info(
+                        f"[{table_name}] DRY RUN: would process {missing_date} from {source_date}"
+                    )
+                    continue
+
+                # A date interrupted in the middle of its write is processed
+                # again: rows already stored are skipped by the existing keys
+                # filter (or INSERT IGNORE), nothing is deleted since the
+                # bucket may hold rows of the ETL or a wrong TABLE_ROWS guess
+                if journal and journal.mark_started(table_name, missing_date):
+                    if cfg.inject:
+                        logger.info(
+                            f"[{table_name}] Resuming interrupted date {missing_date}"
+                        )
+                    else:
+                        logger.warning(
+                            f"[{table_name}] Date {missing_date} was interrupted "
+                            f"while dumped: the SQL dumps of the previous run may "
+                            f"hold part of its rows, dumped again in full"
+                        )
+
+                date_rows = 0
+
+                # Entity mode: only the entities without rows on the date
+                entity_ids = None
+                if cfg.coverage_mode == "entity":
+                    coverage = processor.analyze_entity_coverage(
+                        coverage_table(cfg, table_name), granularity, [missing_date]
+                    )
+                    if coverage is not None:
+                        entity_ids = coverage.missing_entities(0)
+
+                # Server-side copy: the rows never leave the database
+                query = None
+                if cfg.copy_mode == "server":
+                    query = processor.server_copy_query(
+                        table_name,
+                        missing_date,
+                        source_date,
+                        entity_gaps=entity_ids is not None,
+                    )
+                if query:
+                    date_rows = writer.copy_on_server(target, *query)
+                    total_processed += date_rows
+
+                else:
+                    for transformed_rows in processor.iter_changed_rows(
+                        table_name, missing_date, source_date, entity_ids
+                    ):
+                        if pipeline:
+                            pipeline.submit(target, transformed_rows)
+                            date_rows += len(transformed_rows)
+                        else:
+                            processed = writer._write_data(target, transformed_rows)
+                            total_processed += processed
+                            date_rows += processed
+
+                completed.append((missing_date, date_rows))
+                if journal and direct_writes:
+                    journal.mark_completed(table_name, completed)
+                    completed = []
+
+            if pipeline:
+                total_processed += pipeline.wait()
+
+            if processor.source_cache is not None:
+                logger.debug(
+                    f"[{table_name}] Source day cache: "
+                    f"{processor.source_cache.hits} hits, "
+                    f"{processor.source_cache.misses} misses"
+                )
+        finally:
+            if pipeline:
+                pipeline.stop()
+            writer.close()
+
+        if journal and completed:
+            journal.mark_completed(table_name, completed)
+
+        return table_name, total_processed, None, METRICS.drain()
 
     except Exception as e:
         logger.error(f"[{table_name}] Error: {e}")
-        return table_name, 0, f"ERROR: {str(e)}", {}
+        return table_name, 0, f"ERROR: {str(e)}", METRICS.drain()
+
+
+def split_into_work_units(
+    plans: List[TablePlan], workers: int, unit_size: int = 0
+) -> List[Tuple[str, List[Tuple[datetime, datetime]]]]:
+    """
+    Split the prepared tables into work units of consecutive dates, largest
+    first, so that the longest tables keep every worker busy. With unit_size=0
+    the size is chosen to get about 4 units per worker.
+    """
+    total = sum(len(plan.assignments) for plan in plans)
+    if not unit_size:
+        unit_size = max(math.ceil(total / (max(workers, 1) * 4)), 1)
+
+    units = []
+    for plan in plans:
+        for i in range(0, len(plan.assignments), unit_size):
+            units.append((plan.table, plan.assignments[i : i + unit_size]))
+
+    units.sort(key=lambda unit: len(unit[1]), reverse=True)
+    return units
+
+
+def merge_unit_results(
+    plans: List[TablePlan],
+    unit_results: List[Tuple[str, int, Optional[str], Dict]],
+) -> List[Tuple[str, int, str, Dict]]:
+    """Merge work unit results back into one result per table."""
+    results = []
+    for plan in plans:
+        if plan.status != "OK":
+            results.append((plan.table, 0, plan.status, plan.stats))
+            continue
+
+        processed = 0
+        status = "OK"
+        for table, unit_processed, error, _ in unit_results:
+            if table != plan.table:
+                continue
+            processed += unit_processed
+            if error:
+                status = error
+        results.append((plan.table, processed, status, plan.stats))
+
+    return results
+
+
+def write_throughput(report: Dict) -> Dict[str, Tuple]:
+    """Rows, seconds and rows/sec of the database writes, by session profile."""
+    totals = RunMetrics.phase_totals(report)
+
+    throughput = {}
+    for profile in ("bulk", "default"):
+        counters = totals.get(f"write_{profile}", {})
+        rows = counters.get("rows", 0)
+        elapsed = counters.get("seconds", 0)
+        if rows:
+            throughput[profile] = (rows, elapsed, rows / elapsed if elapsed else 0)
+    return throughput
+
+
+def bulk_session_gain(report: Dict, baseline_path: str) -> Optional[Tuple]:
+    """
+    Rows/sec gain of the bulk session profile over the default one, measured
+    on the same tables: those written with the bulk profile in this run and
+    with the default profile in the baseline run (the --report-json of a run
+    without --bulk-session). Returns the gain and the compared tables.
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f).get("tables", {})
+
+    rows = {"bulk": 0, "default": 0}
+    seconds = {"bulk": 0.0, "default": 0.0}
+    tables = []
+    for table, phases in report.get("tables", {}).items():
+        bulk = phases.get("write_bulk", {})
+        default = baseline.get(table, {}).get("phases", {}).get("write_default", {})
+        if not bulk.get("rows") or not default.get("rows"):
+            continue
+        for profile, counters in (("bulk", bulk), ("default", default)):
+            rows[profile] += counters["rows"]
+            seconds[profile] += counters.get("seconds", 0)
+        tables.append(table)
+
+    if not tables or not seconds["bulk"] or not seconds["default"]:
+        return None
+    rates = {profile: rows[profile] / seconds[profile] for profile in rows}
+    return rates["bulk"] / rates["default"] - 1, tables
+
+
+@profiled
+def process_table(
+    args: Tuple[Config, str, Optional[DimensionSnapshot]],
+) -> Tuple[str, int, str, Dict]:
+    """Process a complete table (prepare_run is expected to have been run)."""
+    cfg, table_name, dimensions = args
+
+    plan = prepare_table((cfg, table_name))
+    METRICS.absorb(plan.metrics)
+    if plan.status != "OK":
+        finish_shadow_table(cfg, table_name, plan.status)
+        return table_name, 0, plan.status, plan.stats
+
+    assignments = tqdm(plan.assignments, desc=f"{table_name}", leave=False)
+    dropped = drop_secondary_indexes(cfg, target_table(cfg, table_name))
+    failed = []
+    try:
+        unit_result = process_unit((cfg, table_name, assignments, dimensions))
+        METRICS.absorb(unit_result[3])
+    finally:
+        if dropped:
+            elapsed, failed = restore_secondary_indexes(
+                (cfg, target_table(cfg, table_name))
+            )
+            METRICS.add(table_name, "rebuild_indexes", calls=1, seconds=elapsed)
+
+    result = merge_unit_results([plan], [unit_result])[0]
+    if failed:
+        # The shadow keeps its dropped indexes: it must not be merged
+        result = (result[0], result[1], INDEX_REBUILD_ERROR, result[3])
+    finish_shadow_table(cfg, table_name, result[2])
+    return result
+
+
+def sql_latencies(report: Dict) -> Dict[str, Dict[str, float]]:
+    """Calls, seconds and latency percentiles of each statement shape."""
+    return {
+        shape: {
+            "calls": counters.get("calls", 0),
+            "seconds": round(counters.get("seconds", 0), 3),
+            **latency_percentiles(counters),
+        }
+        for shape, counters in sorted(
+            report.get("tables", {}).get(SQL_STATS_TABLE, {}).items(),
+            key=lambda item: item[1].get("seconds", 0),
+            reverse=True,
+        )
+    }
+
+
+def write_run_report(
+    path: str,
+    report: Dict,
+    results: List[Tuple[str, int, str, Dict]],
+    preparation: Dict[str, float],
+    start_time: float,
+    duration: float,
+):
+    """Write the machine-readable report of the run (--report-json)."""
+    total_rows = sum(processed for _, processed, _, _ in results)
+    document = {
+        "started_at": datetime.fromtimestamp(start_time, tz=TZ_INFO).isoformat(),
+        "duration_s": round(duration, 3),
+        "total_rows": total_rows,
+        "rows_per_s": round(total_rows / duration, 1) if duration > 0 else None,
+        "preparation_s": {step: round(t, 3) for step, t in preparation.items()},
+        "tables": {
+            table: {
+                "status": status,
+                "rows": processed,
+                "stats": stats,
+                "phases": report.get("tables", {}).get(table, {}),
+            }
+            for table, processed, status, stats in results
+        },
+        "phases": RunMetrics.phase_totals(report),
+        "workers": report.get("workers", {}),
+        "sql": sql_latencies(report),
+        "explains": report.get("explains", {}),
+    }
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, default=str)
+    logger.info(f"Run report written to {path}")
 
 
 def main():
@@ -1908,6 +5001,9 @@ def main():
     )
     parser.add_argument("--host", required=True, help="MySQL host")
     parser.add_argument("--port", type=int, default=3306, help="MySQL port")
+    parser.add_argument(
+        "--socket", help="MySQL Unix socket, used instead of --host and --port"
+    )
     parser.add_argument("--user", required=True, help="MySQL user")
     parser.add_argument("--password", required=True, help="MySQL password")
     parser.add_argument("--database", required=True, help="MySQL database")
@@ -1960,7 +5056,209 @@ def main():
         action="store_true",
         help="Truncate desired tables",
     )
+    parser.add_argument(
+        "--coverage-mode",
+        choices=["probe", "partitions", "scan", "entity"],
+        default="probe",
+        help="How existing dates are detected: per-bucket index probes, "
+        "partition statistics for daily tables, a full DISTINCT scan, or "
+        "per-entity gaps so that only missing (entity, date) cells are "
+        "filled (default: probe)",
+    )
+    parser.add_argument(
+        "--writer",
+        choices=["insert", "load-data"],
+        default="insert",
+        help="Injection backend: extended INSERT statements or "
+        "LOAD DATA LOCAL INFILE streaming (default: insert)",
+    )
+    parser.add_argument(
+        "--dump-compression",
+        choices=["none", "gzip", "zstd"],
+        default="gzip",
+        help="Compression of SQL dumps (default: gzip, zstd needs zstandard)",
+    )
+    parser.add_argument(
+        "--dump-file-size",
+        type=int,
+        default=DUMP_FILE_SIZE_MB,
+        help=f"Uncompressed size in MB after which a SQL dump file is rotated "
+        f"(default: {DUMP_FILE_SIZE_MB})",
+    )
+    parser.add_argument(
+        "--dump-packet-size",
+        type=int,
+        default=DUMP_PACKET_SIZE,
+        help=f"Maximum size in bytes of one INSERT statement in SQL dumps, "
+        f"to match the target max_allowed_packet (default: {DUMP_PACKET_SIZE})",
+    )
+    parser.add_argument(
+        "--unit-size",
+        type=int,
+        default=0,
+        help="Number of missing dates per parallel work unit "
+        "(default: 0, automatic sizing from --parallel)",
+    )
+    parser.add_argument(
+        "--pipeline-max-rows",
+        type=int,
+        default=0,
+        help="Overlap row generation and database writes, buffering at most "
+        "this many generated rows (default: 0, disabled; needs --pool-size 3 "
+        "or more, and a net_write_timeout of the source server longer than "
+        "the writers may keep the buffer full)",
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=POOL_SIZE,
+        help=f"Connections of the pool of each worker process (default: "
+        f"{POOL_SIZE}, max: {pooling.CNX_POOL_MAXSIZE})",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=0,
+        help="Rows per INSERT statement of every table (default: 0, the "
+        "batch_size of each table in TABLES_CONFIG)",
+    )
+    parser.add_argument(
+        "--pipeline-writers",
+        type=int,
+        default=1,
+        help="Number of writer threads of the pipeline, each with its own "
+        "pooled connection, the producer keeping two (default: 1, "
+        "max: --pool-size minus 2)",
+    )
+    parser.add_argument(
+        "--skip-hostname-sync",
+        action="store_true",
+        help="Do not copy host names from hosts into the BI dimension tables",
+    )
+    parser.add_argument(
+        "--generator",
+        choices=["numpy", "python"],
+        default="numpy" if np is not None else "python",
+        help="Fake data generator: vectorized NumPy columns or per-row Python "
+        "dicts (default: numpy when installed)",
+    )
+    parser.add_argument(
+        "--copy-mode",
+        choices=["client", "server"],
+        default="client",
+        help="Real data copy: rows transformed in Python, or one "
+        "INSERT ... SELECT per date run by the server (default: client)",
+    )
+    parser.add_argument(
+        "--source-cache-mb",
+        type=int,
+        default=SOURCE_CACHE_MB,
+        help=f"Memory budget in MB of the real-data source day cache of each "
+        f"worker, so a source day replayed on several dates is fetched once "
+        f"(default: {SOURCE_CACHE_MB}, 0 disables it)",
+    )
+    parser.add_argument(
+        "--source-cache-spill",
+        action="store_true",
+        help="Spill the source days evicted from the cache to temporary "
+        "files, read back chunk by chunk, instead of fetching them again",
+    )
+    parser.add_argument(
+        "--journal",
+        default=JOURNAL_FILE,
+        help=f"SQLite checkpoint journal of the planned and completed dates "
+        f"(default: {JOURNAL_FILE})",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume an interrupted run from the journal: its completed dates "
+        "are skipped and missing dates are not computed again",
+    )
+    parser.add_argument(
+        "--bulk-session",
+        action="store_true",
+        help="Write with bulk-load session settings (unique_checks and "
+        "foreign_key_checks off, one transaction per write call), restored "
+        "after each write; tables can opt out in TABLES_CONFIG",
+    )
+    parser.add_argument(
+        "--skip-binlog",
+        action="store_true",
+        help="Write with sql_log_bin=0 (needs SUPER or BINLOG ADMIN). WARNING: "
+        "the backfilled rows never reach the replicas of the MBI database",
+    )
+    parser.add_argument(
+        "--bulk-baseline",
+        help="--report-json of a run without --bulk-session: the summary "
+        "reports the write throughput gain on the tables written by both runs",
+    )
+    parser.add_argument(
+        "--rebuild-indexes",
+        action="store_true",
+        help="Drop the secondary indexes of the tables opted in TABLES_CONFIG "
+        "before the load and rebuild them in one ALTER TABLE afterwards "
+        "(journaled, rebuilt by the next run after a crash)",
+    )
+    parser.add_argument(
+        "--shadow-load",
+        action="store_true",
+        help="Write the missing dates into an empty <table>__new shadow, merged "
+        "into the live table day by day once done (EXCHANGE PARTITION under "
+        "a write lock, or one INSERT ... SELECT per day), so reports never "
+        "read a half-loaded day; with --truncate the shadow replaces the table "
+        "with an atomic RENAME TABLE",
+    )
+    parser.add_argument(
+        "--report-json",
+        help="Write a JSON report of the run: per table and per worker process "
+        "phase timings, calls, rows, bytes and SQL statement counts",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="profiles",
+        help="Profile every table worker with cProfile and tracemalloc, writing "
+        "<dir>/run-<timestamp>/<table>.pstats and <table>.memory.txt "
+        "(default dir: profiles)",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=30,
+        help="Number of functions of the merged profile summary (default: 30)",
+    )
+    parser.add_argument(
+        "--sql-stats",
+        action="store_true",
+        help="Time every SQL statement and report p50/p95/p99 latencies "
+        "by statement shape",
+    )
+    parser.add_argument(
+        "--explain-threshold-ms",
+        type=float,
+        default=1000,
+        help="With --sql-stats, EXPLAIN statements slower than this, once per "
+        "statement shape (0 disables, default: 1000)",
+    )
     args = parser.parse_args()
+    if args.generator == "numpy" and np is None:
+        parser.error("--generator numpy requires the numpy package")
+    if args.resume and not os.path.exists(args.journal):
+        parser.error(f"--resume requires the journal {args.journal}")
+    if args.shadow_load and not args.inject:
+        parser.error("--shadow-load requires --inject")
+    if args.copy_mode == "server" and (args.fake_data or not args.inject):
+        parser.error("--copy-mode server requires --inject and real data")
+    if not 1 <= args.pool_size <= pooling.CNX_POOL_MAXSIZE:
+        parser.error(f"--pool-size must be between 1 and {pooling.CNX_POOL_MAXSIZE}")
+    if args.batch_size < 0:
+        parser.error("--batch-size must be positive")
+    if args.pipeline_max_rows and args.pool_size < 3:
+        parser.error(
+            "--pipeline-max-rows needs --pool-size 3 or more: the producer "
+            "holds two connections and each writer one"
+        )
     config = Config(args)
 
     # Filter tables if specified
@@ -1983,39 +5281,132 @@ def main():
 
     start_time = time.time()
 
-    # Parallel aggregated table processing
+    if args.source_cache_spill and config.source_cache_mb and not config.use_fake_data:
+        config.source_cache_dir = tempfile.mkdtemp(prefix="mbi_source_days_")
+
+    # mod_bi_time, partitions and data_bin are prepared once for the whole run
+    preparation = prepare_run(config, [tc.name for tc in tables_to_process])
+
+    # Dimension IDs are loaded once and shared by every table worker
+    dimensions = None
+    if config.use_fake_data and not config.dry_run:
+        dimensions = DimensionSnapshot(
+            config.metric_name, config.liveservice_name
+        ).load(ConnectionManager(config))
+
+    # Phase metrics of the run, merged from every process
+    report = {}
+
+    # Parallel processing: tables are prepared, then split into work units
     if config.parallel > 1:
         with concurrent.futures.ProcessPoolExecutor(
             max_workers=config.parallel
         ) as executor:
-            tasks = [(config, table_config.name) for table_config in tables_to_process]
-            futures = [executor.submit(process_table, task) for task in tasks]
-
-            results = []
-            for future in tqdm(
-                concurrent.futures.as_completed(futures),
-                total=len(futures),
-                desc="Tables processed",
-            ):
-                try:
-                    result = future.result()
-                    results.append(result)
-                    table, processed, status, stats = result
-                    tqdm.write(f"{table}: {processed} rows - {status}")
-                except Exception as e:
-                    logger.error(f"Processing error: {e}")
+            plans = list(
+                tqdm(
+                    executor.map(
+                        prepare_table,
+                        [
+                            (config, table_config.name)
+                            for table_config in tables_to_process
+                        ],
+                    ),
+                    total=len(tables_to_process),
+                    desc="Tables prepared",
+                )
+            )
+
+            units = split_into_work_units(plans, config.parallel, config.unit_size)
+            logger.info(f"Work units to process: {len(units)}")
+
+            # Secondary indexes are dropped once all tables are planned, and
+            # rebuilt in parallel when every unit is done
+            rebuild_failures = set()
+            rebuilt_tables = [
+                target_table(config, plan.table)
+                for plan in plans
+                if plan.status == "OK"
+                and drop_secondary_indexes(config, target_table(config, plan.table))
+            ]
+
+            try:
+                futures = {
+                    executor.submit(
+                        process_unit, (config, table, assignments, dimensions)
+                    ): table
+                    for table, assignments in units
+                }
+
+                unit_results = []
+                for future in tqdm(
+                    concurrent.futures.as_completed(futures),
+                    total=len(futures),
+                    desc="Work units processed",
+                ):
+                    try:
+                        unit_results.append(future.result())
+                    except Exception as e:
+                        # A unit lost with its worker fails its table, whose
+                        # shadow must not be swapped in
+                        table = futures[future]
+                        logger.error(f"[{table}] Processing error: {e}")
+                        unit_results.append(
+                            (
+                                table,
+                                0,
+                                f"ERROR: {e}",
+                                {"pid": os.getpid(), "tables": {}},
+                            )
+                        )
+            finally:
+                # Each table is rebuilt on its own: a failure leaves the
+                # others rebuilt, the results and the report complete
+                rebuilds = {
+                    executor.submit(restore_secondary_indexes, (config, table)): table
+                    for table in rebuilt_tables
+                }
+                for future in concurrent.futures.as_completed(rebuilds):
+                    table = rebuilds[future]
+                    try:
+                        elapsed, failed = future.result()
+                    except Exception as e:
+                        logger.error(f"[{table}] Index rebuild failed: {e}")
+                        elapsed, failed = 0.0, [table]
+                    METRICS.add(table, "rebuild_indexes", calls=1, seconds=elapsed)
+                    rebuild_failures.update(failed)
+
+        for plan in plans:
+            RunMetrics.merge(report, plan.metrics)
+        for unit_result in unit_results:
+            RunMetrics.merge(report, unit_result[3])
+        results = [
+            (table, processed, INDEX_REBUILD_ERROR, stats)
+            if target_table(config, table) in rebuild_failures
+            else (table, processed, status, stats)
+            for table, processed, status, stats in merge_unit_results(
+                plans, unit_results
+            )
+        ]
+        for table, processed, status, stats in results:
+            finish_shadow_table(config, table, status)
+        for table, processed, status, stats in results:
+            tqdm.write(f"{table}: {processed} rows - {status}")
     else:
         # Sequential processing
         results = []
         for table_config in tqdm(tables_to_process, desc="Tables"):
-            result = process_table((config, table_config.name))
+            result = process_table((config, table_config.name, dimensions))
             results.append(result)
             table, processed, status, stats = result
             logger.info(f"{table}: {processed} rows - {status}")
 
+    if config.source_cache_dir:
+        shutil.rmtree(config.source_cache_dir, ignore_errors=True)
+
     # Final report
     end_time = time.time()
     duration = end_time - start_time
+    RunMetrics.merge(report, METRICS.drain())
 
     logger.info("\n" + "=" * 60)
 
@@ -2031,6 +5422,13 @@ def main():
                 f"  └─ Missing: {stats.get('missing', 0)}, "
                 f"Existing: {stats.get('existing', 0)}"
             )
+            if stats.get("missing_cells") is not None:
+                logger.info(f"  └─ Missing cells: {stats['missing_cells']}")
+            if stats.get("resumed"):
+                logger.info(
+                    f"  └─ Resumed: {stats['resumed']} dates "
+                    f"({stats.get('resumed_rows', 0)} rows) done by a previous run"
+                )
         total_rows += processed
 
         if status.startswith("ERROR"):
@@ -2039,6 +5437,57 @@ def main():
             successful_tables += 1
 
     logger.info("-" * 60)
+    if preparation:
+        logger.info(
+            f"Preparation: {sum(preparation.values()):.2f}s ("
+            + ", ".join(
+                f"{step} {elapsed:.2f}s" for step, elapsed in preparation.items()
+            )
+            + ")"
+        )
+    phases = RunMetrics.phase_totals(report)
+    for phase, counters in sorted(
+        phases.items(),
+        key=lambda item: (item[0] in ENCLOSING_PHASES, -item[1].get("seconds", 0)),
+    ):
+        label = f"{phase} (total)" if phase in ENCLOSING_PHASES else phase
+        logger.info(
+            f"Phase {label:18} {counters.get('seconds', 0):9.2f}s | "
+            f"{counters.get('calls', 0):7.0f} calls | "
+            f"{counters.get('rows', 0):10.0f} rows | "
+            f"{counters.get('statements', 0):7.0f} stmts | "
+            f"{counters.get('bytes', 0) / 1024 / 1024:8.1f} MB"
+        )
+    for shape, latencies in sql_latencies(report).items():
+        logger.info(
+            f"SQL {shape:50} {latencies['calls']:7.0f} calls | "
+            f"{latencies['seconds']:9.2f}s | p50 {latencies.get('p50_ms', 0):8.1f} ms | "
+            f"p95 {latencies.get('p95_ms', 0):8.1f} ms | "
+            f"p99 {latencies.get('p99_ms', 0):8.1f} ms"
+        )
+    if report.get("explains"):
+        logger.info(
+            f"EXPLAIN captured for {len(report['explains'])} slow statement shapes"
+        )
+    throughput = write_throughput(report)
+    for profile, (rows, elapsed, rate) in throughput.items():
+        logger.info(
+            f"Write throughput ({profile} session): {rate:.0f} rows/sec "
+            f"({rows} rows in {elapsed:.2f}s)"
+        )
+    if args.bulk_baseline:
+        compared = bulk_session_gain(report, args.bulk_baseline)
+        if compared:
+            gain, tables = compared
+            logger.info(
+                f"Bulk session gain: {gain:+.0%} rows/sec over {len(tables)} "
+                f"tables of {args.bulk_baseline}"
+            )
+        else:
+            logger.info(
+                f"Bulk session gain: no table written with the bulk session "
+                f"here and the default one in {args.bulk_baseline}"
+            )
     logger.info(f"TOTAL: {total_rows} rows processed in {duration:.2f}s")
     logger.info(
         f"Average throughput: {total_rows / duration:.0f} rows/sec"
@@ -2052,6 +5501,28 @@ def main():
 
     logger.info("=" * 60)
 
+    if args.report_json:
+        write_run_report(
+            args.report_json, report, results, preparation, start_time, duration
+        )
+
+    if config.profile_dir:
+        summary = merge_profiles(config.profile_dir, args.profile_top)
+        if summary:
+            logger.info(
+                f"Profiles written to {config.profile_dir}, top functions:\n{summary}"
+            )
+
+    index_failures = [
+        table for table, _, status, _ in results if status == INDEX_REBUILD_ERROR
+    ]
+    if index_failures:
+        logger.error(
+            f"Secondary indexes of {', '.join(index_failures)} are still dropped, "
+            f"rebuilt by the next run from the journal"
+        )
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()